@@ -5,7 +5,7 @@
  
 import os
 import pandas as pd
-from supabase import create_client, Client
+from common.supabase_factory import get_client
 from dotenv import load_dotenv
  
 # Initialize Supabase client
@@ -18,7 +18,7 @@ def get_supabase_client():
     if not url or not key:
         raise ValueError("❌ Missing SUPABASE_URL or SUPABASE_KEY in .env")
        
-    return create_client(url, key)
+    return get_client(url, key)
  
 # # ------------------------------------------------------
 # # Step 1: Create table if not exists
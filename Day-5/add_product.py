@@ -1,13 +1,13 @@
 
 import os
-from supabase import create_client, Client #pip install supabase
+from common.supabase_factory import lazy_client
 from dotenv import load_dotenv # pip install python-dotenv
  
 load_dotenv()
  
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key= os.getenv("SUPABASE_KEY")
-sb: Client = create_client(supabase_url, supabase_key)
+sb = lazy_client(supabase_url, supabase_key)
  
 def add_product(name, sku, price, stock):
     payload = {"name": name, "sku": sku, "price": price, "stock": stock}
@@ -0,0 +1,239 @@
+"""
+Concurrency stress test for library_cli borrow/return.
+
+Runs many concurrent borrowers through library_cli.borrow_book / borrow_books /
+return_book / return_books against LocalLibrary, a SQLite stand-in that serves
+the same RPCs as sql/borrow_return.sql (conditional stock change plus record
+write in one transaction). At the end every book must satisfy
+stock >= 0 and stock + open borrows == initial stock.
+
+    python bench/borrow_stress.py --desks 32 --ops 2000
+    python bench/borrow_stress.py --naive   # old read-then-write path, for comparison
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# library_cli refuses to start without credentials; the stand-in replaces the client
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "stand-in")
+import library_cli
+
+SCHEMA = """
+create table if not exists books (
+    book_id integer primary key, title text, author text, category text,
+    stock integer not null
+);
+create table if not exists borrow_records (
+    record_id integer primary key autoincrement,
+    member_id integer not null, book_id integer not null,
+    borrow_date text not null, return_date text
+);
+"""
+
+class StandInError(Exception):
+    def __init__(self, message, code="P0001"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+class _Call:
+    def __init__(self, fn, params):
+        self._fn = fn
+        self._params = params
+
+    def execute(self):
+        return _Response(self._fn(**self._params))
+
+class LocalLibrary:
+    """SQLite stand-in exposing sb.rpc(...) for the borrow/return functions."""
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with contextlib.closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("pragma journal_mode=wal")
+        return conn
+
+    @property
+    def conn(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = self._connect()
+        return self._local.conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.conn.execute("begin immediate")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("rollback")
+            raise
+        self.conn.execute("commit")
+
+    def rpc(self, name, params):
+        return _Call(getattr(self, "_" + name), params)
+
+    # ---------- mirrors of sql/borrow_return.sql ----------
+    def _insert_record(self, conn, member_id, book_id):
+        now = datetime.now(timezone.utc).isoformat()
+        cur = conn.execute(
+            "insert into borrow_records (member_id, book_id, borrow_date) values (?, ?, ?) returning *",
+            (member_id, book_id, now),
+        )
+        return dict(cur.fetchone())
+
+    def _borrow_book(self, p_member_id, p_book_id):
+        return self._borrow_books(p_member_id, [p_book_id])
+
+    def _borrow_books(self, p_member_id, p_book_ids):
+        copies = {}
+        for bid in p_book_ids:
+            copies[bid] = copies.get(bid, 0) + 1
+        with self.transaction() as conn:
+            for bid in sorted(copies):
+                cur = conn.execute(
+                    "update books set stock = stock - ? where book_id = ? and stock >= ?",
+                    (copies[bid], bid, copies[bid]),
+                )
+                if cur.rowcount == 0:
+                    raise StandInError(f"Book {bid} is out of stock")
+            return [self._insert_record(conn, p_member_id, bid) for bid in p_book_ids]
+
+    def _return_book(self, p_record_id):
+        return self._return_books([p_record_id])
+
+    def _return_books(self, p_record_ids):
+        ids = sorted(set(p_record_ids))
+        marks = ",".join("?" * len(ids))
+        now = datetime.now(timezone.utc).isoformat()
+        with self.transaction() as conn:
+            returned = conn.execute(
+                f"update borrow_records set return_date = ? where record_id in ({marks}) and return_date is null "
+                "returning book_id",
+                (now, *ids),
+            ).fetchall()
+            if len(returned) != len(ids):
+                raise StandInError("Some borrow records were not found or already returned")
+            for row in returned:
+                conn.execute("update books set stock = stock + 1 where book_id = ?", (row["book_id"],))
+            return [dict(r) for r in conn.execute(f"select * from borrow_records where record_id in ({marks})", ids)]
+
+    # ---------- the old three-call borrow, kept to show the race ----------
+    def naive_borrow(self, member_id, book_id):
+        row = self.conn.execute("select stock from books where book_id = ?", (book_id,)).fetchone()
+        if row["stock"] <= 0:
+            return False
+        time.sleep(0)  # let other desks interleave between read and write, as a network hop would
+        self.conn.execute(
+            "insert into borrow_records (member_id, book_id, borrow_date) values (?, ?, ?)",
+            (member_id, book_id, datetime.now(timezone.utc).isoformat()),
+        )
+        self.conn.execute("update books set stock = ? where book_id = ?", (row["stock"] - 1, book_id))
+        return True
+
+def run(desks=32, ops=2000, books=20, stock=50, cart_rate=0.2, return_rate=0.4, naive=False, seed=11):
+    rnd = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="borrow_stress_"), "library.db")
+    lib = LocalLibrary(path)
+    with lib.transaction() as conn:
+        conn.executemany(
+            "insert into books (book_id, title, author, category, stock) values (?, ?, 'Author', 'General', ?)",
+            [(bid, f"Book {bid}", stock) for bid in range(1, books + 1)],
+        )
+    library_cli.sb = lib
+
+    plans = []
+    for i in range(ops):
+        member = rnd.randint(1, 500)
+        if rnd.random() < cart_rate:
+            cart = [rnd.randint(1, books) for _ in range(rnd.randint(2, 4))]
+        else:
+            cart = [rnd.randint(1, books)]
+        plans.append((member, cart, rnd.random() < return_rate))
+    counters = {"borrowed": 0, "rejected": 0, "returned": 0}
+    lock = threading.Lock()
+
+    def desk(plan):
+        member, cart, give_back = plan
+        if naive:
+            ok = all(lib.naive_borrow(member, bid) for bid in cart)
+            records = None
+        elif len(cart) == 1:
+            ok = library_cli.borrow_book(member, cart[0])
+            records = None
+        else:
+            records = library_cli.borrow_books(member, cart)
+            ok = records is not None
+        with lock:
+            counters["borrowed" if ok else "rejected"] += 1
+        if ok and give_back and records:
+            if library_cli.return_books([r["record_id"] for r in records]) is not None:
+                with lock:
+                    counters["returned"] += 1
+
+    started = time.perf_counter()
+    # library_cli reports every refusal on stdout; keep the bench output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=desks) as pool:
+            list(pool.map(desk, plans))
+        # return some single borrows too, one call each
+        open_ids = [r[0] for r in lib.conn.execute("select record_id from borrow_records where return_date is null")]
+        for rid in rnd.sample(open_ids, len(open_ids) // 3):
+            if not naive and library_cli.return_book(rid):
+                counters["returned"] += 1
+    elapsed = time.perf_counter() - started
+
+    rows = lib.conn.execute(
+        "select b.book_id, b.stock, "
+        "(select count(*) from borrow_records r where r.book_id = b.book_id and r.return_date is null) as open "
+        "from books b"
+    ).fetchall()
+    negative = sum(1 for r in rows if r["stock"] < 0)
+    drift = sum(1 for r in rows if r["stock"] + r["open"] != stock)
+
+    print(f"mode:        {'naive read-then-write' if naive else 'atomic rpc'}")
+    print(f"operations:  {ops} ({desks} desks)")
+    print(f"borrowed:    {counters['borrowed']}")
+    print(f"rejected:    {counters['rejected']}")
+    print(f"returned:    {counters['returned']}")
+    print(f"elapsed:     {elapsed:.3f}s")
+    print(f"throughput:  {ops / elapsed:.1f} ops/sec")
+    print(f"oversold:    {negative} books")
+    print(f"stock drift: {drift} books")
+    if negative or drift:
+        raise SystemExit("Stock invariant violated")
+    return counters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desks", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--naive", action="store_true", help="use the old read-then-write borrow")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    run(args.desks, args.ops, args.books, args.stock, naive=args.naive, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
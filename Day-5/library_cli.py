@@ -1,16 +1,30 @@
+import argparse
+import csv
+import json
 import os
 import sys
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict
+from typing import Callable, Iterable, Iterator, Optional, List, Dict
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from pathlib import Path
+from common.batching import chunked, with_retries, run_batches as run_batch_pool
+from common.supabase_factory import lazy_client
+from library_search import SearchIndex, server_search
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("Please set SUPABASE_URL and SUPABASE_KEY in your .env file.")
     sys.exit(1)
-sb: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+sb = lazy_client(SUPABASE_URL, SUPABASE_KEY)
+# LIBRARY_SEARCH: "server" uses the search_books RPC (sql/book_search.sql),
+# "local" an on-disk index at LIBRARY_INDEX_PATH built on first search
+LIBRARY_SEARCH = os.getenv("LIBRARY_SEARCH", "server")
+LIBRARY_INDEX_PATH = os.getenv("LIBRARY_INDEX_PATH", str(Path(__file__).with_name(".library_index.json")))
+_search_index = None
+# set once the index was rebuilt from the books table in this process
+_search_index_fresh = False
 def now_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 def print_row(row: dict):
@@ -31,10 +45,31 @@ def update_member_email(member_id: int, new_email: str) -> bool:
         print("Error updating:", resp.error)
         return False
     return len(resp.data) > 0
+def has_rows(table: str, column: str, value) -> bool:
+    # fetches at most one key column, however many rows match
+    resp = sb.table(table).select(column).eq(column, value).limit(1).execute()
+    return bool(resp.data)
+def ids_with_borrows(column: str, ids: List[int]) -> set:
+    """
+    The subset of ids (member_id or book_id values) that have any
+    borrow_records row, in one query via members_with_borrows() /
+    books_with_borrows() from sql/dependency_checks.sql.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return set()
+    fn = {"member_id": "members_with_borrows", "book_id": "books_with_borrows"}[column]
+    try:
+        resp = sb.rpc(fn, {"p_ids": ids}).execute()
+        return {r[column] for r in resp.data or []}
+    except Exception as e:
+        if not _rpc_missing(e):
+            raise
+    # not deployed yet: one limit(1) probe per id, still no bulk transfer
+    return {i for i in ids if has_rows("borrow_records", column, i)}
 def delete_member(member_id: int):
     try:
-        resp = sb.table("borrow_records").select("*").eq("member_id", member_id).execute()
-        if resp.data and len(resp.data) > 0:
+        if has_rows("borrow_records", "member_id", member_id):
             print(" Cannot delete — member still has borrowed books.")
             return False
         del_resp = sb.table("members").delete().eq("member_id", member_id).execute()
@@ -56,6 +91,10 @@ def add_book(title, author, category, stock):
     }
     try:
         resp = sb.table("books").insert(payload).execute()
+        index = _open_index()
+        if index:
+            for row in resp.data or []:
+                index.add(row)
         return resp.data   # returns the inserted row(s)
     except Exception as e:
         print("Error inserting book:", e)
@@ -63,21 +102,54 @@ def add_book(title, author, category, stock):
 def list_books() -> List[dict]:
     resp = sb.table("books").select("*").order("book_id", desc=False).execute()
     return resp.data or []
-def search_books(term: str) -> List[dict]:
-    books = list_books()
-    term_low = term.lower()
-    return [b for b in books if term_low in (b.get("title","").lower() + b.get("author","").lower() + (b.get("category") or "").lower())]
+def _open_index() -> Optional[SearchIndex]:
+    # the local index is only maintained once it exists
+    global _search_index
+    if _search_index is None:
+        _search_index = SearchIndex.load(LIBRARY_INDEX_PATH)
+    return _search_index
+def rebuild_search_index() -> SearchIndex:
+    global _search_index, _search_index_fresh
+    _search_index = SearchIndex.build(list_books(), LIBRARY_INDEX_PATH)
+    _search_index_fresh = True
+    return _search_index
+def _local_search(term: str, limit: int) -> List[dict]:
+    index = _open_index() or rebuild_search_index()
+    results = index.search(term, limit)
+    # borrow history only for the matched books, never a scan of borrow_records
+    try:
+        borrowed = ids_with_borrows("book_id", [b["book_id"] for b in results])
+    except Exception as e:
+        print(" Borrow status not available:", _rpc_error(e), file=sys.stderr)
+        return results
+    return [{**b, "has_borrows": b["book_id"] in borrowed} for b in results]
+def search_books(term: str, limit: int = 20) -> List[dict]:
+    if LIBRARY_SEARCH == "local":
+        return _local_search(term, limit)
+    try:
+        return server_search(sb, term, limit)
+    except Exception as e:
+        if not _rpc_missing(e):
+            raise
+    # search_books() is not deployed yet. The snapshot on disk may predate
+    # changes made by other clients, so it is rebuilt before first use here
+    if not _search_index_fresh:
+        print(" search_books() RPC not found (sql/book_search.sql); "
+              "falling back to a local index rebuilt from the books table", file=sys.stderr)
+        rebuild_search_index()
+    return _local_search(term, limit)
 def update_book_stock(book_id: int, new_stock: int) -> bool:
     resp = sb.table("books").update({"stock": new_stock}).eq("book_id", book_id).execute()
     if not resp.data:
         print("Error updating stock:", resp.error)
         return False
+    index = _open_index()
+    if index:
+        index.update(book_id, stock=new_stock)
     return len(resp.data) > 0
 def delete_book(book_id: int):
     try:
-        resp = sb.table("borrow_records").select("*").eq("book_id", book_id).execute()
-
-        if resp.data and len(resp.data) > 0:
+        if has_rows("borrow_records", "book_id", book_id):
             print(" Cannot delete — book is currently borrowed.")
             return False
         del_resp = sb.table("books").delete().eq("book_id", book_id).execute()
@@ -85,95 +157,137 @@ def delete_book(book_id: int):
             print("No book found with that ID.")
             return False
         else:
+            index = _open_index()
+            if index:
+                index.remove(book_id)
             print("Book deleted successfully:", del_resp.data)
             return True
     except Exception as e:
         print(" Error deleting book:", e)
         return False
+def _rpc_error(e: Exception) -> str:
+    # postgrest APIError keeps the raised message in .message
+    return getattr(e, "message", None) or str(e)
+def _refresh_index_stock(records: List[dict]):
+    """
+    After a borrow/return RPC changed stock server-side, re-read the stock
+    of the affected books (one in_ query) into the local search index.
+    """
+    index = _open_index()
+    book_ids = sorted({r["book_id"] for r in records or [] if r.get("book_id") is not None})
+    if not index or not book_ids:
+        return
+    try:
+        resp = sb.table("books").select("book_id, stock").in_("book_id", book_ids).execute()
+    except Exception as e:
+        # the borrow/return itself succeeded; the next rebuild fixes the index
+        print(" Search index not refreshed:", _rpc_error(e), file=sys.stderr)
+        return
+    for b in resp.data or []:
+        index.update(b["book_id"], stock=b["stock"])
 def borrow_book(member_id: int, book_id: int):
+    # borrow_book() decrements stock only if a copy is left and inserts
+    # the record in the same transaction (sql/borrow_return.sql)
     try:
-        book_resp = sb.table("books").select("stock").eq("book_id", book_id).execute()
-        if not book_resp.data or book_resp.data[0]["stock"] <= 0:
-            print("Book is out of stock.")
-            return False
-        borrow_resp = sb.table("borrow_records").insert({
-            "member_id": member_id,
-            "book_id": book_id
-        }).execute()
-        new_stock = book_resp.data[0]["stock"] - 1
-        sb.table("books").update({"stock": new_stock}).eq("book_id", book_id).execute()
-        print(" Borrow recorded:", borrow_resp.data)
+        resp = sb.rpc("borrow_book", {"p_member_id": member_id, "p_book_id": book_id}).execute()
+        print(" Borrow recorded:", resp.data)
+        _refresh_index_stock(resp.data)
         return True
     except Exception as e:
-        print(" Error borrowing book:", e)
+        print(" Error borrowing book:", _rpc_error(e))
         return False
-from datetime import datetime
+def borrow_books(member_id: int, book_ids: List[int]) -> Optional[List[dict]]:
+    """Check out a whole cart atomically: every book is borrowed or none is."""
+    if not book_ids:
+        return []
+    try:
+        resp = sb.rpc("borrow_books", {"p_member_id": member_id, "p_book_ids": list(book_ids)}).execute()
+        _refresh_index_stock(resp.data)
+        return resp.data or []
+    except Exception as e:
+        print(" Error borrowing books:", _rpc_error(e))
+        return None
 def return_book(record_id: int):
     try:
-        rec_resp = sb.table("borrow_records").select("book_id, return_date").eq("record_id", record_id).execute()
-        if not rec_resp.data:
-            print(" No borrow record found with that id.")
-            return False
-        record = rec_resp.data[0]
-        if record["return_date"] is not None:
-            print(" Book already returned.")
-            return False
-        book_id = record["book_id"]
-        sb.table("borrow_records").update({
-            "return_date": datetime.now().isoformat()
-        }).eq("record_id", record_id).execute()
-        book_resp = sb.table("books").select("stock").eq("book_id", book_id).execute()
-        if book_resp.data:
-            new_stock = book_resp.data[0]["stock"] + 1
-            sb.table("books").update({"stock": new_stock}).eq("book_id", book_id).execute()
+        resp = sb.rpc("return_book", {"p_record_id": record_id}).execute()
         print("Book returned successfully!")
+        _refresh_index_stock(resp.data)
         return True
     except Exception as e:
-        print(" Error returning book:", e)
+        print(" Error returning book:", _rpc_error(e))
         return False
+def return_books(record_ids: List[int]) -> Optional[List[dict]]:
+    """Return many borrow records atomically; fails if any is already returned."""
+    if not record_ids:
+        return []
+    try:
+        resp = sb.rpc("return_books", {"p_record_ids": list(record_ids)}).execute()
+        _refresh_index_stock(resp.data)
+        return resp.data or []
+    except Exception as e:
+        print(" Error returning books:", _rpc_error(e))
+        return None
 def report_overdue(days_overdue: int = 14) -> List[dict]:
-    resp = sb.table("borrow_records").select("*").is_("return_date", None).execute()
-    if  not resp.data:
-        print("Error fetching borrow records:", resp.error)
+    # one query: the server filters open, old records and embeds member/book
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days_overdue)).isoformat()
+    try:
+        resp = (
+            sb.table("borrow_records")
+            .select("*, members(name), books(title)")
+            .is_("return_date", "null")
+            .lt("borrow_date", cutoff)
+            .order("borrow_date")
+            .execute()
+        )
+    except Exception as e:
+        print("Error fetching borrow records:", e)
         return []
-    rows = resp.data or []
     overdue = []
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days_overdue)
-    for r in rows:
-        bd = r.get("borrow_date")
-        if not bd:
-            continue
-        try:
-            bd_dt = datetime.fromisoformat(bd.replace("Z", "+00:00"))
-        except Exception:
-            continue
-        if bd_dt < cutoff:
-            # enrich with member/book details
-            member = get_member(r.get("member_id")) or {}
-            book_resp = sb.table("books").select("*").eq("book_id", r.get("book_id")).execute()
-            book = (book_resp.data[0] if book_resp.data else {})
-            r2 = r.copy()
-            r2["member_name"] = member.get("name")
-            r2["book_title"] = book.get("title")
-            overdue.append(r2)
+    for r in resp.data or []:
+        member = r.pop("members", None) or {}
+        book = r.pop("books", None) or {}
+        r["member_name"] = member.get("name")
+        r["book_title"] = book.get("title")
+        overdue.append(r)
     return overdue
+def _rpc_missing(e: Exception) -> bool:
+    # PostgREST answers PGRST202 when the function is not deployed
+    return getattr(e, "code", None) in ("PGRST202", "42883") or "Could not find the function" in str(e)
+def _count_borrows_locally(top_n: int) -> List[Dict]:
+    # fallback without sql/library_reports.sql: page through book_id only,
+    # count with a Counter and fetch the top titles in one in_ query
+    counts = Counter()
+    after = 0
+    while True:
+        page = (
+            sb.table("borrow_records").select("record_id, book_id")
+            .gt("record_id", after).order("record_id").limit(1000).execute().data or []
+        )
+        counts.update(r["book_id"] for r in page)
+        if len(page) < 1000:
+            break
+        after = page[-1]["record_id"]
+    top = counts.most_common(top_n)
+    ids = [bid for bid, _ in top]
+    titles = {}
+    if ids:
+        books = sb.table("books").select("book_id, title").in_("book_id", ids).execute().data or []
+        titles = {b["book_id"]: b["title"] for b in books}
+    return [{"book_id": bid, "title": titles.get(bid, "(deleted)"), "borrow_count": cnt} for bid, cnt in top]
 def report_most_borrowed(top_n: int = 5) -> List[Dict]:
-    resp = sb.table("borrow_records").select("*").execute()
-    if  not resp.data:
-        print("Error fetching borrow_records:", resp.error)
+    # grouped and ranked in the database by most_borrowed_books()
+    try:
+        resp = sb.rpc("most_borrowed_books", {"top_n": top_n}).execute()
+        return [{**r, "title": r.get("title") or "(deleted)"} for r in resp.data or []]
+    except Exception as e:
+        if not _rpc_missing(e):
+            print("Error fetching borrow_records:", e)
+            return []
+    try:
+        return _count_borrows_locally(top_n)
+    except Exception as e:
+        print("Error fetching borrow_records:", e)
         return []
-    rows = resp.data or []
-    counts = {}
-    for r in rows:
-        bid = r.get("book_id")
-        counts[bid] = counts.get(bid, 0) + 1
-    sorted_bids = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
-    result = []
-    for bid, cnt in sorted_bids:
-        book_resp = sb.table("books").select("*").eq("book_id", bid).execute()
-        book = (book_resp.data[0] if book_resp.data else {"title": "(deleted)"})
-        result.append({"book_id": bid, "title": book.get("title"), "borrow_count": cnt})
-    return result
 def show_member_with_borrows(member_id: int):
     try:
         member_resp = sb.table("members").select("*").eq("member_id", member_id).execute()
@@ -241,8 +355,11 @@ def main_loop():
         elif choice == "4":
             term = input("Search term (title/author/category): ").strip()
             results = search_books(term)
+            if not results:
+                print("No matching books.")
             for b in results:
-                print(f"{b['book_id']}: {b['title']} by {b['author']} | stock: {b['stock']}")
+                borrowed = " | has borrow records" if b.get("has_borrows") else ""
+                print(f"{b['book_id']}: {b['title']} by {b['author']} | stock: {b['stock']}{borrowed}")
         elif choice == "5":
             bid = int(input("Book id: ").strip())
             new_stock = int(input("New stock: ").strip())
@@ -263,13 +380,25 @@ def main_loop():
             print("Deleted." if ok else "Failed.")
         elif choice == "9":
             mid = int(input("Member id: ").strip())
-            bid = int(input("Book id: ").strip())
-            ok = borrow_book(mid, bid)
-            print("Borrowed." if ok else "Failed.")
+            bids = [int(x) for x in input("Book id(s), comma-separated: ").replace(",", " ").split()]
+            if not bids:
+                print("No book ids given.")
+            else:
+                if len(bids) == 1:
+                    ok = borrow_book(mid, bids[0])
+                else:
+                    ok = borrow_books(mid, bids) is not None
+                print("Borrowed." if ok else "Failed.")
         elif choice == "10":
-            rid = int(input("Borrow record id to return: ").strip())
-            ok = return_book(rid)
-            print("Returned." if ok else "Failed.")
+            rids = [int(x) for x in input("Borrow record id(s) to return: ").replace(",", " ").split()]
+            if not rids:
+                print("No borrow record ids given.")
+            else:
+                if len(rids) == 1:
+                    ok = return_book(rids[0])
+                else:
+                    ok = return_books(rids) is not None
+                print("Returned." if ok else "Failed.")
         elif choice == "11":
             mid = int(input("Member id: ").strip())
             show_member_with_borrows(mid)
@@ -288,5 +417,239 @@ def main_loop():
                 print(f"{r['book_id']}: {r['title']} — borrowed {r['borrow_count']} times")
         else:
             print("Unknown choice. Try again.")
+def delete_many(kind: str, ids: List[int]) -> dict:
+    """
+    Delete many members or books: one query finds the ids that still have
+    borrow records, one delete removes the rest. If a borrow is recorded
+    in between, the delete hits a foreign key; the ids are then deleted one
+    by one and the ones still referenced are reported as blocked.
+    Returns {"deleted": [...], "blocked": [...], "missing": [...]}.
+    """
+    table, column = {"members": ("members", "member_id"), "books": ("books", "book_id")}[kind]
+    ids = list(dict.fromkeys(ids))
+    blocked = ids_with_borrows(column, ids)
+    deletable = [i for i in ids if i not in blocked]
+    deleted = []
+    if deletable:
+        try:
+            resp = sb.table(table).delete().in_(column, deletable).execute()
+            deleted = sorted(r[column] for r in resp.data or [])
+        except Exception as e:
+            if not _fk_violation(e):
+                raise
+            for i in deletable:
+                try:
+                    resp = sb.table(table).delete().eq(column, i).execute()
+                    deleted.extend(r[column] for r in resp.data or [])
+                except Exception as e:
+                    if not _fk_violation(e):
+                        raise
+                    print(f"{column} {i} not deleted: {_rpc_error(e)}", file=sys.stderr)
+                    blocked.add(i)
+            deleted.sort()
+    if kind == "books":
+        index = _open_index()
+        if index:
+            for bid in deleted:
+                index.remove(bid)
+    gone = set(deleted)
+    return {"deleted": deleted, "blocked": sorted(blocked),
+            "missing": [i for i in deletable if i not in gone and i not in blocked]}
+def _fk_violation(e: Exception) -> bool:
+    # SQLSTATE 23503: the row is still referenced, e.g. by borrow_records
+    return getattr(e, "code", None) == "23503" or "foreign key" in str(e)
+# -------------------- batch imports --------------------
+def _read_rows(path: str) -> Iterator[dict]:
+    # CSV or JSONL (by extension), streamed; "-" reads CSV from stdin
+    if path == "-":
+        yield from csv.DictReader(sys.stdin)
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+def _unique_violation(e: Exception) -> bool:
+    # SQLSTATE 23505, e.g. an email that is already a member
+    return getattr(e, "code", None) == "23505" or "duplicate key" in str(e)
+def _write_isolating(write: Callable[[List[dict]], List[dict]], batch: List[dict], retries: int,
+                     retry_delay: float):
+    """
+    write(batch) with retries for transient errors. A unique violation is
+    not retried: the batch is split in halves until the offending rows are
+    alone, so they are rejected one by one and the rest is still written.
+    Returns (written rows, [(row, error)]).
+    """
+    try:
+        return with_retries(write, batch, retries=retries, retry_delay=retry_delay,
+                            retryable=lambda e: not _unique_violation(e)), []
+    except Exception as e:
+        if not _unique_violation(e):
+            raise
+        if len(batch) == 1:
+            return [], [(batch[0], _rpc_error(e))]
+    mid = len(batch) // 2
+    written, rejected = _write_isolating(write, batch[:mid], retries, retry_delay)
+    more_written, more_rejected = _write_isolating(write, batch[mid:], retries, retry_delay)
+    return written + more_written, rejected + more_rejected
+def run_batches(rows: Iterable[dict], write: Callable[[List[dict]], List[dict]], batch_size: int = 500,
+                workers: int = 4, retries: int = 3, retry_delay: float = 1.0,
+                on_batch: Optional[Callable[[dict], None]] = None,
+                on_written: Optional[Callable[[List[dict]], None]] = None) -> dict:
+    """
+    Send rows to write(batch) -> written rows, batch_size at a time on a
+    pool of workers (common/batching.py). A batch that still fails after
+    `retries` attempts is reported and the run goes on; rows that break a
+    unique constraint are rejected individually (see _write_isolating).
+    on_written runs on the calling thread, so it may touch shared state.
+    """
+    summary = {"rows": 0, "written": 0, "batches": 0, "failed_batches": 0, "failed_rows": 0, "rejected_rows": 0}
+    def done(batch_no: int, batch: List[dict], result, error: Optional[Exception]):
+        summary["rows"] += len(batch)
+        report = {"batch": batch_no, "rows": len(batch)}
+        if error:
+            summary["failed_batches"] += 1
+            summary["failed_rows"] += len(batch)
+            report["error"] = _rpc_error(error)
+        else:
+            written, rejected = result
+            summary["written"] += len(written)
+            summary["rejected_rows"] += len(rejected)
+            report["written"] = len(written)
+            report["rejected"] = rejected
+            if on_written:
+                on_written(written)
+        if on_batch:
+            on_batch(report)
+    summary["batches"] = run_batch_pool(
+        chunked(rows, batch_size),
+        lambda batch: _write_isolating(write, batch, retries, retry_delay),
+        workers,
+        done,
+    )
+    return summary
+def _member_row(row: dict) -> dict:
+    return {"name": (row.get("name") or "").strip(), "email": (row.get("email") or "").strip().lower()}
+def _book_row(row: dict) -> dict:
+    return {
+        "title": (row.get("title") or "").strip(),
+        "author": (row.get("author") or "").strip(),
+        "category": (row.get("category") or "").strip() or None,
+        "stock": int(row.get("stock") or 0),
+    }
+def insert_members(batch: List[dict], skip_existing: bool = False) -> List[dict]:
+    # one request per batch; repeated emails inside the batch keep the last row
+    rows = list({m["email"]: m for m in batch}.values())
+    if skip_existing:
+        return sb.table("members").upsert(rows, on_conflict="email", ignore_duplicates=True).execute().data or []
+    return sb.table("members").insert(rows).execute().data or []
+def insert_books(batch: List[dict]) -> List[dict]:
+    return sb.table("books").insert(batch).execute().data or []
+def adjust_stock(batch: List[dict]) -> List[dict]:
+    """
+    Apply stock changes in one transaction (adjust_book_stock() in
+    sql/batch_admin.sql). Rows carry book_id and either delta or stock
+    (absolute); a delta that would go below zero fails the batch.
+    """
+    adjustments = []
+    for row in batch:
+        adj = {"book_id": int(row["book_id"])}
+        if row.get("stock") not in (None, ""):
+            adj["stock"] = int(row["stock"])
+        else:
+            adj["delta"] = int(row.get("delta") or 0)
+        adjustments.append(adj)
+    return sb.rpc("adjust_book_stock", {"p_adjustments": adjustments}).execute().data or []
+def _print_progress(report: dict):
+    if "error" in report:
+        print(f"batch {report['batch']} ({report['rows']} rows): FAILED: {report['error']}", file=sys.stderr)
+    else:
+        print(f"batch {report['batch']} ({report['rows']} rows): {report['written']} written", file=sys.stderr)
+        for row, error in report["rejected"]:
+            print(f"  rejected {json.dumps(row, default=str)}: {error}", file=sys.stderr)
+def _valid(rows: Iterable[dict], normalize: Callable[[dict], dict], required: tuple, summary: dict) -> Iterator[dict]:
+    for n, row in enumerate(rows, 1):
+        try:
+            out = normalize(row)
+            missing = [f for f in required if not out.get(f)]
+            if missing:
+                raise ValueError(f"missing {', '.join(missing)}")
+        except (ValueError, TypeError, KeyError) as e:
+            summary["invalid"] += 1
+            print(f"row {n} skipped: {e}", file=sys.stderr)
+            continue
+        yield out
+def cmd_import(args):
+    invalid = {"invalid": 0}
+    rows = _read_rows(args.file)
+    on_written = None
+    if args.kind == "members":
+        rows = _valid(rows, _member_row, ("name", "email"), invalid)
+        write = lambda batch: insert_members(batch, args.skip_existing)
+    elif args.kind == "books":
+        rows = _valid(rows, _book_row, ("title",), invalid)
+        write = insert_books
+        index = _open_index()
+        if index:
+            on_written = lambda written: [index.add(b) for b in written]
+    else:
+        rows = _valid(rows, lambda r: {**r, "book_id": int(r["book_id"])}, ("book_id",), invalid)
+        write = adjust_stock
+        index = _open_index()
+        if index:
+            on_written = lambda written: [index.update(b["book_id"], stock=b["stock"]) for b in written]
+    summary = run_batches(rows, write, args.batch_size, args.workers, args.retries,
+                          on_batch=_print_progress, on_written=on_written)
+    summary.update(invalid)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed_batches"] or summary["rejected_rows"] else 0
+def cmd_delete(args):
+    if not args.ids and not args.file:
+        print("delete: give ids or --file", file=sys.stderr)
+        return 2
+    ids = list(args.ids)
+    invalid = 0
+    if args.file:
+        for n, r in enumerate(_read_rows(args.file), 1):
+            value = r.get("id") or r.get("member_id") or r.get("book_id")
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                invalid += 1
+                print(f"row {n} skipped: no valid id ({value!r})", file=sys.stderr)
+    result = delete_many(args.kind, ids)
+    result["invalid"] = invalid
+    print(json.dumps(result, indent=2))
+    return 1 if result["blocked"] or result["missing"] or invalid else 0
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="library_cli", description="Library admin; run without arguments for the menu.")
+    sub = parser.add_subparsers(dest="cmd")
+    imp = sub.add_parser("import", help="bulk load members, books or stock adjustments from CSV/JSONL")
+    imp.add_argument("kind", choices=["members", "books", "stock"],
+                     help="members: name,email | books: title,author,category,stock | stock: book_id and delta or stock")
+    imp.add_argument("file", help="CSV or JSONL file, or - for CSV on stdin")
+    imp.add_argument("--batch-size", type=int, default=500)
+    imp.add_argument("--workers", type=int, default=4)
+    imp.add_argument("--retries", type=int, default=3)
+    imp.add_argument("--skip-existing", action="store_true", help="members: ignore emails that already exist")
+    imp.set_defaults(func=cmd_import)
+    dele = sub.add_parser("delete", help="delete many members or books, skipping ones with borrow records")
+    dele.add_argument("kind", choices=["members", "books"])
+    dele.add_argument("ids", nargs="*", type=int)
+    dele.add_argument("--file", default=None, help="CSV/JSONL with an id (or member_id/book_id) column")
+    dele.set_defaults(func=cmd_delete)
+    return parser
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main_loop()
+        return 0
+    args = build_parser().parse_args(argv)
+    if not hasattr(args, "func"):
+        build_parser().print_help()
+        return 0
+    return args.func(args)
 if __name__ == "__main__":
-    main_loop()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
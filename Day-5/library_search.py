@@ -0,0 +1,170 @@
+"""
+Search for library_cli.search_books.
+
+Two paths:
+- server: the search_books(q, max_results) RPC from sql/book_search.sql
+  (full-text plus pg_trgm similarity, ranked in Postgres);
+- local: SearchIndex, an inverted index over title/author/category tokens
+  with trigrams for partial words, kept on disk and updated as books are
+  added, restocked or deleted.
+
+A search only touches the postings of the words it contains, so its cost
+follows the number of matches rather than the size of the catalog.
+"""
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "category": 1.0}
+# how well a query word matches an indexed word
+EXACT, PREFIX, PARTIAL = 1.0, 0.6, 0.3
+DOC_FIELDS = ("book_id", "title", "author", "category", "stock")
+_WORD = re.compile(r"\w+")
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall((text or "").lower())
+def _grams(token: str) -> Set[str]:
+    # "^" marks the start of a word so prefixes of 1-2 letters are findable
+    grams = {"^" + token[:n] for n in (1, 2) if len(token) >= n}
+    grams.update(token[i:i + 3] for i in range(len(token) - 2))
+    return grams
+def _query_grams(word: str) -> Set[str]:
+    if len(word) < 3:
+        return {"^" + word}
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+class SearchIndex:
+    """
+    token -> {book_id: best field weight}, plus trigram -> tokens for
+    partial matches. Persisted as a JSON snapshot at `path` and a JSONL
+    journal at `path + ".log"`; mutations only append to the journal and
+    `save()` folds it back into the snapshot.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.docs: Dict[int, Dict] = {}
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.grams: Dict[str, Set[str]] = defaultdict(set)
+    # ---------- building ----------
+    @classmethod
+    def build(cls, books: Iterable[Dict], path: Optional[str] = None) -> "SearchIndex":
+        index = cls(path)
+        for book in books:
+            index._add(book)
+        if index.path:
+            index.save()
+        return index
+    @classmethod
+    def load(cls, path: str) -> Optional["SearchIndex"]:
+        """Open a persisted index, replaying its journal; None if there is none."""
+        index = cls(path)
+        if not index.path.exists():
+            return None
+        with open(index.path, encoding="utf-8") as f:
+            for book in json.load(f)["docs"]:
+                index._add(book)
+        log = index._log_path()
+        if log.exists():
+            with open(log, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        index._apply(json.loads(line))
+        return index
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "docs": list(self.docs.values())}, f)
+        os.replace(tmp, self.path)
+        self._log_path().unlink(missing_ok=True)
+    # ---------- incremental updates ----------
+    def add(self, book: Dict) -> None:
+        self._record({"op": "add", "book": {k: book.get(k) for k in DOC_FIELDS}})
+    def update(self, book_id: int, **changes) -> None:
+        if book_id in self.docs:
+            self._record({"op": "update", "book_id": book_id, "changes": changes})
+    def remove(self, book_id: int) -> None:
+        if book_id in self.docs:
+            self._record({"op": "remove", "book_id": book_id})
+    def _record(self, op: Dict) -> None:
+        self._apply(op)
+        if self.path:
+            with open(self._log_path(), "a", encoding="utf-8") as f:
+                f.write(json.dumps(op) + "\n")
+    def _apply(self, op: Dict) -> None:
+        if op["op"] == "add":
+            self._add(op["book"])
+        elif op["op"] == "update":
+            if op["book_id"] in self.docs:
+                self._add({**self.docs[op["book_id"]], **op["changes"]})
+        elif op["op"] == "remove":
+            self._remove(op["book_id"])
+    def _add(self, book: Dict) -> None:
+        book_id = book["book_id"]
+        self._remove(book_id)
+        self.docs[book_id] = {k: book.get(k) for k in DOC_FIELDS}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(book.get(field)):
+                posting = self.postings[token]
+                if not posting:
+                    for g in _grams(token):
+                        self.grams[g].add(token)
+                posting[book_id] = max(posting.get(book_id, 0.0), weight)
+    def _remove(self, book_id: int) -> None:
+        old = self.docs.pop(book_id, None)
+        if not old:
+            return
+        for field in FIELD_WEIGHTS:
+            for token in tokenize(old.get(field)):
+                posting = self.postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(book_id, None)
+                if not posting:
+                    del self.postings[token]
+                    for g in _grams(token):
+                        self.grams[g].discard(token)
+                        if not self.grams[g]:
+                            del self.grams[g]
+    def _log_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".log")
+    # ---------- querying ----------
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        # candidate tokens share every trigram of the word; confirm the substring
+        candidate_sets = [self.grams.get(g, set()) for g in _query_grams(word)]
+        candidates = set.intersection(*candidate_sets) if candidate_sets else set()
+        if word in self.postings:
+            candidates.add(word)
+        for token in candidates:
+            if token == word:
+                quality = EXACT
+            elif token.startswith(word):
+                quality = PREFIX
+            elif word in token:
+                quality = PARTIAL
+            else:
+                continue
+            for book_id, weight in self.postings.get(token, {}).items():
+                scores[book_id] = max(scores.get(book_id, 0.0), quality * weight)
+        return scores
+    def search(self, term: str, limit: int = 20) -> List[Dict]:
+        """
+        Books matching every word of term (whole, prefix or inner part of
+        an indexed word), best first. Title matches outrank author matches,
+        which outrank category matches.
+        """
+        words = list(dict.fromkeys(tokenize(term)))
+        if not words:
+            return []
+        # rarest word first so the running intersection stays small
+        per_word = sorted((self._word_scores(w) for w in words), key=len)
+        total = dict(per_word[0])
+        for scores in per_word[1:]:
+            total = {b: s + scores[b] for b, s in total.items() if b in scores}
+            if not total:
+                return []
+        ranked = sorted(total.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [{**self.docs[b], "rank": round(s, 3)} for b, s in ranked]
+def server_search(sb, term: str, limit: int = 20) -> List[Dict]:
+    resp = sb.rpc("search_books", {"q": term, "max_results": limit}).execute()
+    return resp.data or []
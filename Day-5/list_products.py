@@ -1,12 +1,12 @@
-from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
+from common.supabase_factory import lazy_client
  
 load_dotenv()
  
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
-sb: Client = create_client(supabase_url, supabase_key)
+sb = lazy_client(supabase_url, supabase_key)
  
 def list_products():
     resp = sb.table("products").select("*").order("product_id", desc=False).execute()
@@ -0,0 +1,37 @@
+-- Batch stock adjustments for `library_cli.py import stock`.
+-- p_adjustments: [{"book_id": 1, "delta": -2}, {"book_id": 2, "stock": 10}, ...]
+-- Deltas for the same book are summed; an absolute stock wins over deltas.
+-- The whole batch fails if a book is missing or would go below zero.
+create or replace function adjust_book_stock(p_adjustments jsonb)
+returns setof books
+language plpgsql
+as $$
+declare
+    v_expected int;
+    v_updated int;
+begin
+    create temporary table _adj on commit drop as
+    select a.book_id,
+           sum(coalesce(a.delta, 0))::int as delta,
+           (array_agg(a.stock) filter (where a.stock is not null))[1] as stock
+    from jsonb_to_recordset(p_adjustments) as a(book_id bigint, delta int, stock int)
+    group by a.book_id;
+
+    select count(*) into v_expected from _adj;
+
+    update books b
+    set stock = coalesce(a.stock, b.stock + a.delta)
+    from _adj a
+    where b.book_id = a.book_id and coalesce(a.stock, b.stock + a.delta) >= 0;
+    get diagnostics v_updated = row_count;
+
+    if v_updated <> v_expected then
+        raise exception 'Stock adjustment rejected: unknown book or stock below zero' using errcode = 'P0001';
+    end if;
+
+    return query select b.* from books b join _adj a on a.book_id = b.book_id;
+end;
+$$;
+
+-- `import members --skip-existing` upserts on email.
+create unique index if not exists idx_members_email on members (email);
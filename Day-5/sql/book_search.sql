@@ -0,0 +1,39 @@
+-- Server-side search for library_cli.search_books.
+create extension if not exists pg_trgm;
+
+-- Weighted document: title (A) > author (B) > category (C).
+alter table books add column if not exists search tsvector
+    generated always as (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(author, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+    ) stored;
+
+create index if not exists idx_books_search on books using gin (search);
+
+-- Partial words and typos go through trigram similarity on the same text.
+create index if not exists idx_books_search_trgm on books using gin (
+    (lower(coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || coalesce(category, ''))) gin_trgm_ops
+);
+
+create or replace function search_books(q text, max_results int default 20)
+returns table (book_id bigint, title text, author text, category text, stock int, rank real)
+language sql
+stable
+as $$
+    with query as (
+        -- every word must match, as a whole word or a prefix
+        select to_tsquery('simple', string_agg(quote_literal(w) || ':*', ' & ')) as ts,
+               lower(q) as text
+        from regexp_split_to_table(lower(q), '\W+') as w
+        where w <> ''
+    )
+    select b.book_id, b.title, b.author, b.category, b.stock,
+           (ts_rank(b.search, query.ts) +
+            similarity(lower(coalesce(b.title, '') || ' ' || coalesce(b.author, '') || ' ' || coalesce(b.category, '')), query.text))::real as rank
+    from books b, query
+    where b.search @@ query.ts
+       or lower(coalesce(b.title, '') || ' ' || coalesce(b.author, '') || ' ' || coalesce(b.category, '')) % query.text
+    order by rank desc, b.book_id
+    limit max_results;
+$$;
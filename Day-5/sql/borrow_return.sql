@@ -0,0 +1,92 @@
+-- Atomic borrow/return for library_cli. Each function is one transaction:
+-- the stock change is conditional, so concurrent desks cannot oversell.
+
+create or replace function borrow_book(p_member_id bigint, p_book_id bigint)
+returns setof borrow_records
+language plpgsql
+as $$
+begin
+    update books set stock = stock - 1
+    where book_id = p_book_id and stock > 0;
+    if not found then
+        raise exception 'Book % is out of stock', p_book_id using errcode = 'P0001';
+    end if;
+    return query
+        insert into borrow_records (member_id, book_id)
+        values (p_member_id, p_book_id)
+        returning *;
+end;
+$$;
+
+create or replace function return_book(p_record_id bigint)
+returns setof borrow_records
+language plpgsql
+as $$
+declare
+    v_book_id bigint;
+begin
+    update borrow_records set return_date = now()
+    where record_id = p_record_id and return_date is null
+    returning book_id into v_book_id;
+    if not found then
+        raise exception 'Borrow record % not found or already returned', p_record_id using errcode = 'P0001';
+    end if;
+    update books set stock = stock + 1 where book_id = v_book_id;
+    return query select * from borrow_records where record_id = p_record_id;
+end;
+$$;
+
+-- Check out a whole cart: every book is borrowed or none is.
+-- Books are locked in book_id order so overlapping carts cannot deadlock.
+create or replace function borrow_books(p_member_id bigint, p_book_ids bigint[])
+returns setof borrow_records
+language plpgsql
+as $$
+declare
+    r record;
+begin
+    for r in
+        select c.book_id, count(*) as copies
+        from unnest(p_book_ids) as c(book_id)
+        group by c.book_id
+        order by c.book_id
+    loop
+        update books set stock = stock - r.copies
+        where book_id = r.book_id and stock >= r.copies;
+        if not found then
+            raise exception 'Book % is out of stock', r.book_id using errcode = 'P0001';
+        end if;
+    end loop;
+    return query
+        insert into borrow_records (member_id, book_id)
+        select p_member_id, c.book_id from unnest(p_book_ids) as c(book_id)
+        returning *;
+end;
+$$;
+
+-- Return many records at once; all must be open.
+create or replace function return_books(p_record_ids bigint[])
+returns setof borrow_records
+language plpgsql
+as $$
+declare
+    v_open int;
+begin
+    with returned as (
+        update borrow_records set return_date = now()
+        where record_id = any(p_record_ids) and return_date is null
+        returning book_id
+    ), per_book as (
+        select book_id, count(*) as copies from returned group by book_id
+    ), restocked as (
+        update books b set stock = b.stock + p.copies
+        from per_book p where b.book_id = p.book_id
+        returning 1
+    )
+    select count(*) into v_open from returned;
+    if v_open <> cardinality(array(select distinct unnest(p_record_ids))) then
+        raise exception 'Some borrow records were not found or already returned' using errcode = 'P0001';
+    end if;
+    return query select * from borrow_records where record_id = any(p_record_ids);
+end;
+$$;
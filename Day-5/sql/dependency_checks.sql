@@ -0,0 +1,23 @@
+-- Dependency checks for library_cli delete_member / delete_book / `delete`.
+-- Both lookups stop at the first matching borrow record thanks to these indexes.
+create index if not exists idx_borrow_records_member_id on borrow_records (member_id);
+create index if not exists idx_borrow_records_book_id on borrow_records (book_id);
+
+-- Which of p_ids still have borrow records (one row per id, not per record).
+create or replace function members_with_borrows(p_ids bigint[])
+returns table (member_id bigint)
+language sql
+stable
+as $$
+    select i from unnest(p_ids) as i
+    where exists (select 1 from borrow_records r where r.member_id = i);
+$$;
+
+create or replace function books_with_borrows(p_ids bigint[])
+returns table (book_id bigint)
+language sql
+stable
+as $$
+    select i from unnest(p_ids) as i
+    where exists (select 1 from borrow_records r where r.book_id = i);
+$$;
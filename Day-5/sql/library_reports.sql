@@ -0,0 +1,22 @@
+-- Server-side pieces for the library_cli reports.
+
+-- report_overdue: `return_date is null and borrow_date < :cutoff order by borrow_date`
+create index if not exists idx_borrow_records_open_borrow_date
+    on borrow_records (borrow_date)
+    where return_date is null;
+
+-- report_most_borrowed groups by book_id here.
+create index if not exists idx_borrow_records_book_id on borrow_records (book_id);
+
+create or replace function most_borrowed_books(top_n int default 5)
+returns table (book_id bigint, title text, borrow_count bigint)
+language sql
+stable
+as $$
+    select r.book_id, b.title, count(*) as borrow_count
+    from borrow_records r
+    left join books b on b.book_id = r.book_id
+    group by r.book_id, b.title
+    order by borrow_count desc, r.book_id
+    limit top_n;
+$$;
@@ -1,12 +1,12 @@
-from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
+from common.supabase_factory import lazy_client
  
 load_dotenv()
  
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
-sb: Client = create_client(supabase_url, supabase_key)
+sb = lazy_client(supabase_url, supabase_key)
  
 def update_stock(product_id, new_stock):
     resp = sb.table("products").update({"stock": new_stock}).eq("product_id", product_id).execute()
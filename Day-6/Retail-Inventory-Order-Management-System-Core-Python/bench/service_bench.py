@@ -0,0 +1,131 @@
+"""
+Offline throughput benchmark for order_service.
+
+Seeds a local backend (memory or SQLite) with synthetic customers and products,
+replays a random create/cancel/complete workload through the service layer and
+reports ops/sec and p50/p99 latency per service function. No network needed.
+
+    python -m bench.service_bench --backend sqlite --ops 5000
+    python -m bench.service_bench --json out.json --baseline baseline.json --tolerance 0.2
+
+With --baseline the run fails (exit 1) if any function's ops/sec drops more than
+--tolerance below the baseline, so CI can catch throughput regressions.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.dao.supabase_client import create_backend, set_backend
+from src.services import order_service
+
+WORKLOAD = (("create_order", 0.7), ("cancel_order", 0.15), ("complete_order", 0.15))
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+def seed(backend, customers, products):
+    backend.table("customers").insert(
+        [{"name": f"Customer {i}", "email": f"c{i}@bench.local", "phone": "0"} for i in range(customers)]
+    ).execute()
+    backend.table("products").insert(
+        [{"name": f"Product {i}", "sku": f"SKU-{i}", "price": 1 + i % 50, "stock": 1_000_000} for i in range(products)]
+    ).execute()
+
+def run(backend_name="memory", ops=2000, customers=200, products=500, max_items=5, seed_value=42):
+    path = None
+    if backend_name == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(prefix="retail_bench_"), "bench.db")
+    backend = create_backend(backend_name, path)
+    set_backend(backend)
+    seed(backend, customers, products)
+
+    rnd = random.Random(seed_value)
+    names = [n for n, _ in WORKLOAD]
+    weights = [w for _, w in WORKLOAD]
+    placed = []
+    latencies = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+
+    started = time.perf_counter()
+    for _ in range(ops):
+        name = rnd.choices(names, weights)[0]
+        if name != "create_order" and not placed:
+            name = "create_order"
+        if name == "create_order":
+            items = [{"prod_id": rnd.randint(1, products), "quantity": rnd.randint(1, 3)}
+                     for _ in range(rnd.randint(1, max_items))]
+            call = lambda: order_service.create_order(rnd.randint(1, customers), items)
+        else:
+            order_id = placed.pop(rnd.randrange(len(placed)))
+            call = lambda: getattr(order_service, name)(order_id)
+        t0 = time.perf_counter()
+        try:
+            result = call()
+        except order_service.OrderError:
+            errors[name] += 1
+            result = None
+        latencies[name].append((time.perf_counter() - t0) * 1000)
+        if name == "create_order" and result:
+            placed.append(result["order_id"])
+    elapsed = time.perf_counter() - started
+
+    report = {"backend": backend_name, "ops": ops, "elapsed_s": elapsed, "ops_per_sec": ops / elapsed, "functions": {}}
+    for name, values in latencies.items():
+        values.sort()
+        spent = sum(values) / 1000
+        report["functions"][name] = {
+            "calls": len(values),
+            "errors": errors[name],
+            "ops_per_sec": len(values) / spent if spent else 0.0,
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99),
+        }
+    return report
+
+def print_report(report):
+    print(f"backend: {report['backend']}  ops: {report['ops']}  "
+          f"elapsed: {report['elapsed_s']:.3f}s  total: {report['ops_per_sec']:.1f} ops/sec")
+    print(f"{'function':<16} {'calls':>7} {'errors':>6} {'ops/sec':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, f in report["functions"].items():
+        print(f"{name:<16} {f['calls']:>7} {f['errors']:>6} {f['ops_per_sec']:>10.1f} "
+              f"{f['p50_ms']:>8.3f} {f['p99_ms']:>8.3f}")
+
+def check_baseline(report, baseline, tolerance):
+    """Names of functions whose throughput fell more than `tolerance` below the baseline."""
+    regressed = []
+    for name, f in report["functions"].items():
+        base = baseline.get("functions", {}).get(name)
+        if base and f["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressed.append(name)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(prog="retail-service-bench")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--json", default=None, help="write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = run(args.backend, args.ops, args.customers, args.products)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressed = check_baseline(report, json.load(f), args.tolerance)
+        if regressed:
+            raise SystemExit(f"Throughput regression in: {', '.join(regressed)}")
+
+if __name__ == "__main__":
+    main()
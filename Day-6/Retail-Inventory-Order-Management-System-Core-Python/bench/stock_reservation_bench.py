@@ -0,0 +1,93 @@
+"""
+Concurrency benchmark for stock reservations.
+
+Fires many parallel orders through src.dao.stock_dao against the local SQLite
+backend (src/dao/backends/sqlite.py), whose reserve_stock / release_stock use the
+same conditional decrement as sql/stock_reservations.sql, then checks throughput
+and that stock never oversells.
+
+    python -m bench.stock_reservation_bench --orders 500 --workers 32
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.dao import stock_dao
+from src.dao.supabase_client import create_backend, set_backend
+
+def run(orders=500, workers=32, products=20, stock=100, cancel_rate=0.2, retry_rate=0.1, seed=7):
+    rnd = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="stock_bench_"), "bench.db")
+    backend = create_backend("sqlite", path)
+    set_backend(backend)
+    backend.table("products").insert(
+        [{"name": f"Product {pid}", "sku": f"SKU-{pid}", "price": 1, "stock": stock} for pid in range(1, products + 1)]
+    ).execute()
+
+    baskets = [
+        [{"prod_id": rnd.randint(1, products), "quantity": rnd.randint(1, 5)} for _ in range(rnd.randint(1, 5))]
+        for _ in range(orders)
+    ]
+    plans = [(uuid.uuid4().hex, b, rnd.random() < cancel_rate, rnd.random() < retry_rate) for b in baskets]
+    counters = {"placed": 0, "rejected": 0, "cancelled": 0}
+    lock = threading.Lock()
+
+    def place(plan):
+        key, basket, cancel, retry = plan
+        try:
+            stock_dao.reserve_stock(key, basket)
+            if retry:
+                stock_dao.reserve_stock(key, basket)
+        except Exception:
+            with lock:
+                counters["rejected"] += 1
+            return
+        outcome = "placed"
+        if cancel:
+            stock_dao.release_stock(key)
+            stock_dao.release_stock(key)
+            outcome = "cancelled"
+        with lock:
+            counters[outcome] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(place, plans))
+    elapsed = time.perf_counter() - started
+
+    held = {}
+    for r in backend.table("stock_reservations").select("*").eq("status", "RESERVED").execute().data:
+        held[r["prod_id"]] = held.get(r["prod_id"], 0) + r["quantity"]
+    rows = backend.table("products").select("prod_id, stock").execute().data
+    negative = sum(1 for p in rows if p["stock"] < 0)
+    mismatched = sum(1 for p in rows if p["stock"] + held.get(p["prod_id"], 0) != stock)
+
+    print(f"orders:      {orders} ({workers} workers)")
+    print(f"placed:      {counters['placed']}")
+    print(f"cancelled:   {counters['cancelled']}")
+    print(f"rejected:    {counters['rejected']}")
+    print(f"elapsed:     {elapsed:.3f}s")
+    print(f"throughput:  {orders / elapsed:.1f} orders/sec")
+    print(f"oversold:    {negative} products")
+    print(f"stock drift: {mismatched} products")
+    if negative or mismatched:
+        raise SystemExit("Stock invariant violated")
+    return counters
+
+def main():
+    parser = argparse.ArgumentParser(prog="stock-reservation-bench")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--cancel-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.orders, args.workers, args.products, args.stock, args.cancel_rate)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+-- Writes an order header and all of its items in one transaction.
+-- Called from order_dao.create_order(..., atomic=True) via supabase.rpc().
+create or replace function create_order_with_items(order_data jsonb, items jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    new_order orders;
+    new_items jsonb;
+begin
+    insert into orders (cust_id, total_amount, reservation_key)
+    values ((order_data->>'cust_id')::bigint,
+            (order_data->>'total_amount')::numeric,
+            order_data->>'reservation_key')
+    returning * into new_order;
+
+    with ins as (
+        insert into order_items (order_id, prod_id, quantity, price)
+        select new_order.order_id,
+               (i->>'prod_id')::bigint,
+               (i->>'quantity')::int,
+               (i->>'price')::numeric
+        from jsonb_array_elements(items) as i
+        returning *
+    )
+    select coalesce(jsonb_agg(to_jsonb(ins)), '[]'::jsonb) into new_items from ins;
+
+    return to_jsonb(new_order) || jsonb_build_object('items', new_items);
+end;
+$$;
@@ -0,0 +1,5 @@
+-- Supports customer_dao.get_existing_emails (`email in (...)`) and the
+-- on-conflict insert used by customer_service.import_customers.
+-- The service layer stores emails trimmed and lower-cased, so a plain
+-- unique index on email is enough to reject case variants.
+create unique index if not exists customers_email_key on customers (email);
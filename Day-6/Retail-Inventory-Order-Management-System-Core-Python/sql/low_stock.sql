@@ -0,0 +1,19 @@
+-- Supports product_dao.list_low_stock_page: `stock <= :threshold order by prod_id`.
+create index if not exists idx_products_stock_prod_id on products (stock, prod_id);
+
+-- Precomputed low-stock list for the replenishment job (default threshold 5).
+-- Refresh it on a schedule, e.g. every minute from pg_cron:
+--   select cron.schedule('refresh-low-stock', '* * * * *', 'select refresh_low_stock_products()');
+create materialized view if not exists low_stock_products as
+select prod_id, sku, name, stock, category
+from products
+where stock <= 5;
+
+create unique index if not exists idx_low_stock_products_prod_id on low_stock_products (prod_id);
+
+create or replace function refresh_low_stock_products()
+returns void
+language sql
+as $$
+    refresh materialized view concurrently low_stock_products;
+$$;
@@ -0,0 +1,43 @@
+-- Incrementally maintained revenue rollups (src/services/analytics_service.py).
+-- One row per (dimension, dim_key): dimension is 'day' (dim_key YYYY-MM-DD),
+-- 'product' (prod_id) or 'customer' (cust_id). orders/units/revenue are net of
+-- cancellations; completed_* and cancelled_* count those events separately.
+create table if not exists revenue_rollups (
+    dimension text not null,
+    dim_key text not null,
+    orders int not null default 0,
+    units int not null default 0,
+    revenue numeric not null default 0,
+    completed_orders int not null default 0,
+    completed_revenue numeric not null default 0,
+    cancelled_orders int not null default 0,
+    cancelled_revenue numeric not null default 0,
+    primary key (dimension, dim_key)
+);
+
+create index if not exists idx_revenue_rollups_revenue on revenue_rollups (dimension, revenue desc);
+
+-- Adds every delta row to its rollup, creating missing rows, in one transaction.
+create or replace function apply_revenue_rollups(deltas jsonb)
+returns void
+language sql
+as $$
+    insert into revenue_rollups as r (dimension, dim_key, orders, units, revenue,
+                                      completed_orders, completed_revenue,
+                                      cancelled_orders, cancelled_revenue)
+    select d->>'dimension', d->>'dim_key',
+           coalesce((d->>'orders')::int, 0), coalesce((d->>'units')::int, 0),
+           coalesce((d->>'revenue')::numeric, 0),
+           coalesce((d->>'completed_orders')::int, 0), coalesce((d->>'completed_revenue')::numeric, 0),
+           coalesce((d->>'cancelled_orders')::int, 0), coalesce((d->>'cancelled_revenue')::numeric, 0)
+    from jsonb_array_elements(deltas) as d
+    order by 1, 2
+    on conflict (dimension, dim_key) do update set
+        orders = r.orders + excluded.orders,
+        units = r.units + excluded.units,
+        revenue = r.revenue + excluded.revenue,
+        completed_orders = r.completed_orders + excluded.completed_orders,
+        completed_revenue = r.completed_revenue + excluded.completed_revenue,
+        cancelled_orders = r.cancelled_orders + excluded.cancelled_orders,
+        cancelled_revenue = r.cancelled_revenue + excluded.cancelled_revenue;
+$$;
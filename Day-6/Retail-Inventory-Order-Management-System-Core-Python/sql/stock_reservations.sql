@@ -0,0 +1,83 @@
+-- Stock reservations: atomic conditional decrements with per-order idempotency keys.
+-- Called from src/dao/stock_dao.py via supabase.rpc().
+create table if not exists stock_reservations (
+    reservation_key text not null,
+    prod_id bigint not null references products(prod_id),
+    quantity int not null check (quantity > 0),
+    status text not null default 'RESERVED',
+    created_at timestamptz not null default now(),
+    primary key (reservation_key, prod_id)
+);
+
+alter table orders add column if not exists reservation_key text unique;
+
+create or replace function reserve_stock(reservation_key text, items jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    item record;
+    updated int;
+    created boolean;
+begin
+    -- serialise retries of the same key
+    perform pg_advisory_xact_lock(hashtext(reserve_stock.reservation_key));
+
+    created := not exists (select 1 from stock_reservations r
+                           where r.reservation_key = reserve_stock.reservation_key);
+    if created then
+        -- fixed prod_id order so concurrent baskets never deadlock
+        for item in
+            select (i->>'prod_id')::bigint as prod_id, (i->>'quantity')::int as quantity
+            from jsonb_array_elements(items) as i
+            order by 1
+        loop
+            update products set stock = stock - item.quantity
+            where prod_id = item.prod_id and stock >= item.quantity;
+            get diagnostics updated = row_count;
+            if updated = 0 then
+                raise exception 'Not enough stock for product: %', item.prod_id;
+            end if;
+            insert into stock_reservations (reservation_key, prod_id, quantity)
+            values (reserve_stock.reservation_key, item.prod_id, item.quantity);
+        end loop;
+    end if;
+
+    -- created is false when the key was already reserved and nothing was taken
+    return jsonb_build_object(
+        'created', created,
+        'reservations', (select coalesce(jsonb_agg(to_jsonb(r)), '[]'::jsonb) from stock_reservations r
+                         where r.reservation_key = reserve_stock.reservation_key));
+end;
+$$;
+
+create or replace function release_stock(reservation_key text, items jsonb default '[]'::jsonb)
+returns jsonb
+language plpgsql
+as $$
+begin
+    perform pg_advisory_xact_lock(hashtext(release_stock.reservation_key));
+
+    if not exists (select 1 from stock_reservations r
+                   where r.reservation_key = release_stock.reservation_key) then
+        -- orders placed before reservations existed: record the items as released
+        -- so the stock is returned exactly once
+        insert into stock_reservations (reservation_key, prod_id, quantity, status)
+        select release_stock.reservation_key, (i->>'prod_id')::bigint, (i->>'quantity')::int, 'RESERVED'
+        from jsonb_array_elements(items) as i;
+    end if;
+
+    update products p set stock = p.stock + r.quantity
+    from stock_reservations r
+    where r.reservation_key = release_stock.reservation_key
+      and r.status = 'RESERVED'
+      and p.prod_id = r.prod_id;
+
+    update stock_reservations r set status = 'RELEASED'
+    where r.reservation_key = release_stock.reservation_key
+      and r.status = 'RESERVED';
+
+    return (select coalesce(jsonb_agg(to_jsonb(r)), '[]'::jsonb) from stock_reservations r
+            where r.reservation_key = release_stock.reservation_key);
+end;
+$$;
@@ -0,0 +1,148 @@
+# src/cli/daemon.py
+"""
+Local daemon for retail-cli.
+
+A long-running process keeps the imported services, the Supabase client
+(and its connection pool) and the DAO caches warm, and runs subcommands
+sent over a Unix socket, so scripted bulk work pays the startup cost once.
+
+Protocol: the client sends one JSON line {"argv": [...], "cwd": "..."};
+the server answers with JSON lines {"out": text}, {"err": text} and a
+final {"exit": code}. Commands run one at a time because they redirect
+the process-wide stdout/stderr. stdin is not forwarded: reading it raises.
+"""
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+
+FLUSH_BYTES = 64 * 1024
+
+class _FrameWriter(io.TextIOBase):
+    """
+    Text stream that forwards what a command prints to the client as
+    {"out"/"err": text} frames, buffered so row-at-a-time writers stay cheap.
+    """
+    def __init__(self, wfile, kind):
+        self._wfile = wfile
+        self._kind = kind
+        self._parts = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= FLUSH_BYTES:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._parts:
+            _send(self._wfile, {self._kind: "".join(self._parts)})
+            self._parts = []
+            self._size = 0
+
+class _NoStdin(io.TextIOBase):
+    """
+    The daemon's stdin: the client's stdin is not forwarded, so a command
+    reading "-" fails loudly instead of seeing an empty input.
+    """
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        raise OSError("stdin is not forwarded to the daemon; pass a file or run without --socket")
+
+    def readline(self, size=-1):
+        return self.read()
+
+def _send(wfile, frame):
+    wfile.write(json.dumps(frame).encode("utf-8") + b"\n")
+    wfile.flush()
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        out = _FrameWriter(self.wfile, "out")
+        err = _FrameWriter(self.wfile, "err")
+        code = 0
+        previous = os.getcwd()
+        try:
+            # relative paths in the command resolve against the client's cwd
+            os.chdir(request.get("cwd") or previous)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                code = self.server.run(request["argv"])
+        except Exception:
+            err.write(traceback.format_exc())
+            code = 1
+        finally:
+            os.chdir(previous)
+            out.flush()
+            err.flush()
+        _send(self.wfile, {"exit": code or 0})
+
+class _Server(socketserver.UnixStreamServer):
+    def __init__(self, path, run):
+        self.run = run
+        super().__init__(path, _Handler)
+
+def _in_use(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+            return True
+        except OSError:
+            return False
+
+def serve(path, run):
+    """
+    Serve run(argv) -> exit code on the Unix socket at path until
+    interrupted. A stale socket file left by a dead daemon is replaced.
+    """
+    if os.path.exists(path):
+        if _in_use(path):
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)
+    server = _Server(path, run)
+    # stdin belongs to the daemon, not the client
+    sys.stdin = _NoStdin()
+    print(f"retail-cli daemon listening on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+def send(path, argv):
+    """
+    Run argv on the daemon at path, copying its output to this process's
+    stdout/stderr as it arrives. Returns the command's exit code.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        request = {"argv": list(argv), "cwd": os.getcwd()}
+        s.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with s.makefile("rb") as rfile:
+            for line in rfile:
+                frame = json.loads(line)
+                if "out" in frame:
+                    sys.stdout.write(frame["out"])
+                elif "err" in frame:
+                    sys.stderr.write(frame["err"])
+                else:
+                    sys.stdout.flush()
+                    return frame["exit"]
+    raise ConnectionError(f"Daemon on {path} closed the connection")
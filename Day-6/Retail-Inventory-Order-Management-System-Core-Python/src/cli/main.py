@@ -1,10 +1,19 @@
 import argparse
+import contextlib
+import csv
+import getpass
+import itertools
 import json
-from src.services import product_service
-from src.dao import product_dao
+import os
+import shlex
+import sys
+import tempfile
+# services (and through them the DAO layer and SDK) are imported inside the
+# command functions, so --help and argument parsing stay cheap
 
 # -------------------- Product Command Functions --------------------
 def cmd_product_add(args):
+    from src.services import product_service
     try:
         p = product_service.add_product(
             args.name, args.sku, args.price, args.stock, args.category
@@ -15,12 +24,237 @@ def cmd_product_add(args):
         print("Error:", e)
 
 def cmd_product_list(args):
-    ps = product_dao.list_products(limit=100)
-    print(json.dumps(ps, indent=2, default=str))
+    from src.services import product_service
+    fields = _parse_fields(args.fields)
+    rows = product_service.iter_catalog(
+        args.page_size, after=args.after, limit=args.limit or None, fields=fields
+    )
+    _write_rows(sys.stdout, rows, args.format, fields)
+
+def _open_input(path):
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, newline="", encoding="utf-8")
+
+def _open_output(path):
+    if not path or path == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, "w", newline="", encoding="utf-8")
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+def _read_rows(path, fmt):
+    # yields one dict per record without loading the file
+    with _open_input(path) as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def _parse_fields(value):
+    if not value:
+        return None
+    return [f.strip() for f in value.split(",") if f.strip()]
+
+TABLE_SAMPLE = 50
+TABLE_MAX_WIDTH = 40
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+def _write_table(out, rows, columns):
+    # column widths come from the first rows only so output can start
+    # before the last page has been fetched; later wider cells are clipped
+    head = list(itertools.islice(rows, TABLE_SAMPLE))
+    if columns is None:
+        columns = list(head[0]) if head else []
+    widths = [
+        min(TABLE_MAX_WIDTH, max([len(c)] + [len(_cell(r.get(c))) for r in head]))
+        for c in columns
+    ]
+
+    def line(values):
+        cells = []
+        for v, w in zip(values, widths):
+            v = v if len(v) <= w else v[: w - 1] + "~"
+            cells.append(v.ljust(w))
+        out.write("  ".join(cells).rstrip() + "\n")
+
+    line(columns)
+    line(["-" * w for w in widths])
+    count = 0
+    for row in itertools.chain(head, rows):
+        line([_cell(row.get(c)) for c in columns])
+        count += 1
+    return count
+
+def _write_rows(out, rows, fmt, fields=None):
+    """
+    Write rows to out as they arrive. fmt is json, ndjson/jsonl, csv or
+    table; fields restricts and orders the columns. Returns the row count.
+    """
+    rows = iter(rows)
+    if fields:
+        rows = ({f: r.get(f) for f in fields} for r in rows)
+    if fmt == "table":
+        return _write_table(out, rows, fields)
+    count = 0
+    if fmt == "csv":
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=fields or list(row), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+    elif fmt == "json":
+        out.write("[")
+        for row in rows:
+            out.write(",\n  " if count else "\n  ")
+            out.write(json.dumps(row, default=str))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    else:
+        for row in rows:
+            out.write(json.dumps(row, default=str) + "\n")
+            count += 1
+    return count
+
+def cmd_product_import(args):
+    from src.services import product_service
+    def progress(report):
+        if "batch" in report:
+            status = f"FAILED: {report['error']}" if "error" in report else "ok"
+            print(f"batch {report['batch']} ({report['rows']} rows): {status}", file=sys.stderr)
+        else:
+            print(f"row {report['row']} skipped: {report['error']}", file=sys.stderr)
+
+    rows = _read_rows(args.file, _detect_format(args.file, args.format))
+    summary = product_service.import_products(
+        rows, batch_size=args.batch_size, workers=args.workers, retries=args.retries, on_batch=progress
+    )
+    print(json.dumps(summary, indent=2))
+
+def cmd_product_export(args):
+    from src.services import product_service
+    fmt = _detect_format(args.output or "", args.format)
+    with _open_output(args.output) as out:
+        count = _write_rows(out, product_service.iter_catalog(args.page_size), fmt)
+    print(f"Exported {count} products", file=sys.stderr)
+
+# -------------------- Customer Command Functions --------------------
+def cmd_customer_import(args):
+    from src.services import customer_service
+
+    with contextlib.ExitStack() as stack:
+        dup_writer = None
+        if args.duplicates:
+            dup_writer = csv.writer(stack.enter_context(_open_output(args.duplicates)))
+            dup_writer.writerow(["email", "reason"])
+
+        def progress(report):
+            if "batch" not in report:
+                print(f"row {report['row']} skipped: {report['error']}", file=sys.stderr)
+            elif "error" in report:
+                print(f"batch {report['batch']} ({report['rows']} rows): FAILED: {report['error']}", file=sys.stderr)
+            else:
+                print(f"batch {report['batch']} ({report['rows']} rows): {report['inserted']} inserted, "
+                      f"{len(report['duplicates'])} duplicates", file=sys.stderr)
+                if dup_writer:
+                    dup_writer.writerows(report["duplicates"])
+
+        rows = _read_rows(args.file, _detect_format(args.file, args.format))
+        summary = customer_service.import_customers(
+            rows, batch_size=args.batch_size, workers=args.workers, retries=args.retries, on_batch=progress
+        )
+    print(json.dumps(summary, indent=2))
+
+# -------------------- Report Command Functions --------------------
+def _print_json(data):
+    print(json.dumps(data, indent=2, default=str))
+
+def cmd_report_day(args):
+    from src.services import analytics_service
+    if args.date:
+        _print_json(analytics_service.get_day(args.date))
+    else:
+        _print_json(analytics_service.list_days(args.start, args.end))
+
+def cmd_report_product(args):
+    from src.services import analytics_service
+    _print_json(analytics_service.get_product(args.id))
+
+def cmd_report_customer(args):
+    from src.services import analytics_service
+    _print_json(analytics_service.get_customer(args.id))
+
+def cmd_report_top(args):
+    from src.services import analytics_service
+    _print_json(analytics_service.top(args.by, args.metric, args.limit))
+
+def cmd_report_rebuild(args):
+    from src.services import analytics_service
+    scanned = analytics_service.rebuild()
+    print(f"Rebuilt rollups from {scanned} orders")
+
+# -------------------- Session Command Functions --------------------
+def _warm_up():
+    # import everything a command could need once, up front
+    from src.services import product_service, analytics_service, order_service, customer_service
+
+def cmd_shell(args):
+    try:
+        import readline  # line editing and history where available
+    except ImportError:
+        pass
+    _warm_up()
+    print("retail-cli shell; type a subcommand, 'help' or 'exit'", file=sys.stderr)
+    while True:
+        try:
+            line = input("retail> ")
+        except EOFError:
+            print()
+            return
+        except KeyboardInterrupt:
+            print()
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print("Error:", e)
+            continue
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            return
+        if argv[0] == "help":
+            argv = ["--help"]
+        if argv[0] in ("shell", "daemon"):
+            print(f"Error: {argv[0]} cannot be nested")
+            continue
+        try:
+            run(argv)
+        except KeyboardInterrupt:
+            print("Interrupted", file=sys.stderr)
+
+def cmd_daemon(args):
+    from src.cli import daemon
+    _warm_up()
+    daemon.serve(args.socket, run)
 
 # -------------------- CLI Parser --------------------
+# mirrors analytics_service.DIMENSIONS without importing it at parse time
+REPORT_DIMENSIONS = ("day", "product", "customer")
+
 def build_parser():
     parser = argparse.ArgumentParser(prog="retail-cli")
+    parser.add_argument("--socket", default=None,
+                        help="send the command to the daemon on this socket (default $RETAIL_CLI_SOCKET)")
     sub = parser.add_subparsers(dest="cmd")
 
     # Product commands
@@ -37,19 +271,127 @@ def build_parser():
     addp.set_defaults(func=cmd_product_add)
 
     # product list
-    listp = pprod_sub.add_parser("list")
+    listp = pprod_sub.add_parser("list", help="stream products ordered by id")
+    listp.add_argument("--format", choices=["json", "ndjson", "csv", "table"], default="json")
+    listp.add_argument("--limit", type=int, default=100, help="max rows, 0 for all")
+    listp.add_argument("--after", type=int, default=None, help="start after this prod_id")
+    listp.add_argument("--fields", default=None, help="comma-separated columns to select")
+    listp.add_argument("--page-size", type=int, default=1000)
     listp.set_defaults(func=cmd_product_list)
 
+    # product import
+    importp = pprod_sub.add_parser("import", help="bulk upsert products on sku from CSV/JSONL")
+    importp.add_argument("file", help="CSV or JSONL file, or - for stdin")
+    importp.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    importp.add_argument("--batch-size", type=int, default=500)
+    importp.add_argument("--workers", type=int, default=4)
+    importp.add_argument("--retries", type=int, default=3)
+    importp.set_defaults(func=cmd_product_import)
+
+    # product export
+    exportp = pprod_sub.add_parser("export", help="stream the whole catalog as CSV/JSONL")
+    exportp.add_argument("--output", "-o", default=None, help="file to write (default stdout)")
+    exportp.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    exportp.add_argument("--page-size", type=int, default=1000)
+    exportp.set_defaults(func=cmd_product_export)
+
+    # Customer commands
+    p_cust = sub.add_parser("customer", help="customer commands")
+    pcust_sub = p_cust.add_subparsers(dest="action")
+
+    cimportp = pcust_sub.add_parser("import", help="bulk insert customers from CSV/JSONL, skipping duplicate emails")
+    cimportp.add_argument("file", help="CSV or JSONL file, or - for stdin")
+    cimportp.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    cimportp.add_argument("--batch-size", type=int, default=500)
+    cimportp.add_argument("--workers", type=int, default=4)
+    cimportp.add_argument("--retries", type=int, default=3)
+    cimportp.add_argument("--duplicates", default=None, help="write skipped emails and the reason to this CSV")
+    cimportp.set_defaults(func=cmd_customer_import)
+
+    # Report commands
+    p_rep = sub.add_parser("report", help="revenue reports from incrementally maintained rollups")
+    prep_sub = p_rep.add_subparsers(dest="action")
+
+    dayr = prep_sub.add_parser("day", help="revenue for one day or a date range")
+    dayr.add_argument("--date", default=None, help="YYYY-MM-DD")
+    dayr.add_argument("--start", default=None, help="YYYY-MM-DD (with --end, inclusive)")
+    dayr.add_argument("--end", default=None)
+    dayr.set_defaults(func=cmd_report_day)
+
+    prodr = prep_sub.add_parser("product", help="revenue for one product")
+    prodr.add_argument("--id", type=int, required=True)
+    prodr.set_defaults(func=cmd_report_product)
+
+    custr = prep_sub.add_parser("customer", help="revenue for one customer")
+    custr.add_argument("--id", type=int, required=True)
+    custr.set_defaults(func=cmd_report_customer)
+
+    topr = prep_sub.add_parser("top", help="top days/products/customers")
+    topr.add_argument("--by", choices=list(REPORT_DIMENSIONS), default="product")
+    topr.add_argument("--metric", choices=["revenue", "units", "orders", "completed_revenue"], default="revenue")
+    topr.add_argument("--limit", type=int, default=10)
+    topr.set_defaults(func=cmd_report_top)
+
+    rebuildr = prep_sub.add_parser("rebuild", help="recompute all rollups from raw orders")
+    rebuildr.set_defaults(func=cmd_report_rebuild)
+
+    # Session commands
+    shellp = sub.add_parser("shell", help="interactive prompt that keeps the client and caches warm")
+    shellp.set_defaults(func=cmd_shell)
+
+    daemonp = sub.add_parser("daemon", help="serve subcommands on a Unix socket")
+    daemonp.add_argument("--socket", default=DEFAULT_SOCKET)
+    daemonp.set_defaults(func=cmd_daemon)
+
     return parser
 
 # -------------------- Main --------------------
-def main():
+# with RETAIL_CLI_SOCKET set (or --socket given before the subcommand),
+# commands are sent to a running daemon instead of being run here; if no
+# daemon is listening they run here after all. The daemon cannot read the
+# client's stdin, so pass a file instead of - when using it
+DEFAULT_SOCKET = os.getenv("RETAIL_CLI_SOCKET") or os.path.join(
+    tempfile.gettempdir(), f"retail-cli-{getpass.getuser()}.sock"
+)
+LOCAL_COMMANDS = ("shell", "daemon")
+
+def run(argv):
+    """
+    Parse argv and run the command in this process. Returns an exit code
+    instead of exiting, so the shell and the daemon can keep going.
+    """
     parser = build_parser()
-    args = parser.parse_args()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code or 0
     if not hasattr(args, "func"):
         parser.print_help()
-        return
-    args.func(args)
+        return 0
+    try:
+        args.func(args)
+    except SystemExit as e:
+        return e.code or 0
+    except Exception as e:
+        print("Error:", e, file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--socket", default=os.getenv("RETAIL_CLI_SOCKET"))
+    opts, rest = pre.parse_known_args(argv)
+    if rest and rest[0] == "daemon" and opts.socket:
+        rest = rest + ["--socket", opts.socket]
+    if opts.socket and rest and rest[0] not in LOCAL_COMMANDS and rest[0] not in ("-h", "--help"):
+        from src.cli import daemon
+        try:
+            sys.exit(daemon.send(opts.socket, rest))
+        except (FileNotFoundError, ConnectionRefusedError):
+            # nothing was sent, so the command can safely run here instead
+            print(f"No daemon on {opts.socket}; running in-process", file=sys.stderr)
+    sys.exit(run(rest))
 
 if __name__== "__main__":
     main()
\ No newline at end of file
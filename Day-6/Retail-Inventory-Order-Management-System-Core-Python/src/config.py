@@ -1,16 +1,16 @@
 import os
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from common.supabase_factory import get_client
  
 load_dotenv()  # loads .env from project root
  
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
  
-def get_supabase() -> Client:
+def get_supabase():
     """
     Return a supabase client. Raises RuntimeError if config missing.
     """
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+    return get_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
@@ -0,0 +1,67 @@
+from src.dao.aio.supabase_client import get_client
+from src.dao import cache
+from src.dao.aio.errors import write_rows
+
+async def create_customers(customers, on_conflict="error"):
+    if not customers:
+        return []
+    supabase = await get_client()
+    rows = await write_rows(supabase.table("customers"), customers, "email", on_conflict)
+    # the written rows carry every key (e.g. cust_id), so all aliases are dropped
+    written = {r.get("email"): r for r in rows}
+    for c in customers:
+        cache.invalidate("customer", written.get(c["email"]), email=c["email"])
+    return rows
+
+async def create_customer(name, email, phone, city=None):
+    payload = {"name": name, "email": email, "phone": phone}
+    if city:
+        payload["city"] = city
+    rows = await create_customers([payload])
+    return rows[0] if rows else None
+
+async def _get_customer_by(field, value):
+    row = cache.get("customer", field, value)
+    if row is not None:
+        return row
+    supabase = await get_client()
+    resp = await supabase.table("customers").select("*").eq(field, value).limit(1).execute()
+    row = resp.data[0] if resp.data else None
+    if row is not None:
+        cache.put("customer", row)
+    return row
+
+async def get_customer_by_id(cust_id):
+    return await _get_customer_by("cust_id", cust_id)
+
+async def get_customer_by_email(email):
+    return await _get_customer_by("email", email)
+
+async def get_customers_by_ids(cust_ids):
+    found = {}
+    missing = []
+    for cid in dict.fromkeys(cust_ids):
+        row = cache.get("customer", "cust_id", cid)
+        if row is not None:
+            found[cid] = row
+        else:
+            missing.append(cid)
+    if missing:
+        supabase = await get_client()
+        resp = await supabase.table("customers").select("*").in_("cust_id", missing).execute()
+        for c in resp.data or []:
+            cache.put("customer", c)
+            found[c["cust_id"]] = c
+    return found
+
+async def get_existing_emails(emails):
+    if not emails:
+        return set()
+    supabase = await get_client()
+    resp = await supabase.table("customers").select("email").in_("email", list(emails)).execute()
+    return {c["email"] for c in resp.data or []}
+
+async def list_customers(limit=100):
+    supabase = await get_client()
+    resp = await supabase.table("customers").select("*").limit(limit).execute()
+    return resp.data or []
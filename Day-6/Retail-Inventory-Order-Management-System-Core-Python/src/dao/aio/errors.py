@@ -0,0 +1,16 @@
+from src.dao.errors import DuplicateKeyError, is_unique_violation
+
+async def write_rows(table, rows, conflict_column, on_conflict="error"):
+    """Async twin of src.dao.errors.write_rows."""
+    if on_conflict == "error":
+        query = table.insert(rows)
+    elif on_conflict in ("update", "ignore"):
+        query = table.upsert(rows, on_conflict=conflict_column, ignore_duplicates=on_conflict == "ignore")
+    else:
+        raise ValueError(f"on_conflict must be error, update or ignore, not {on_conflict!r}")
+    try:
+        return (await query.execute()).data or []
+    except Exception as e:
+        if is_unique_violation(e):
+            raise DuplicateKeyError(f"{conflict_column} already exists: {e}") from e
+        raise
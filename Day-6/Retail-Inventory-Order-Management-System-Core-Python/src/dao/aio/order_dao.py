@@ -0,0 +1,144 @@
+import asyncio
+from src.dao.aio.supabase_client import get_client
+from src.dao.order_dao import _item_payloads
+
+async def create_order(order_data, items, atomic=False):
+    if atomic:
+        return await create_order_atomic(order_data, items)
+    supabase = await get_client()
+    res = await supabase.table("orders").insert(order_data).execute()
+    order = res.data[0] if res.data else None
+    if not order:
+        raise Exception("Failed to create order")
+    payloads = _item_payloads(order["order_id"], items)
+    order["items"] = (await supabase.table("order_items").insert(payloads).execute()).data if payloads else []
+    return order
+
+async def create_order_atomic(order_data, items):
+    supabase = await get_client()
+    res = await supabase.rpc("create_order_with_items", {
+        "order_data": order_data,
+        "items": _item_payloads(None, items)
+    }).execute()
+    order = res.data
+    if isinstance(order, list):
+        order = order[0] if order else None
+    if not order:
+        raise Exception("Failed to create order")
+    return order
+
+async def create_orders(entries):
+    if not entries:
+        return []
+    supabase = await get_client()
+    res = await supabase.table("orders").insert([order_data for order_data, _ in entries]).execute()
+    orders = res.data or []
+    if len(orders) != len(entries):
+        raise Exception("Failed to create orders")
+    keys = [order_data.get("reservation_key") for order_data, _ in entries]
+    if all(keys):
+        by_key = {o["reservation_key"]: o for o in orders}
+        orders = [by_key[k] for k in keys]
+    payloads = []
+    for order, (_, items) in zip(orders, entries):
+        payloads += _item_payloads(order["order_id"], items)
+    items_by_order = {o["order_id"]: [] for o in orders}
+    if payloads:
+        for item in (await supabase.table("order_items").insert(payloads).execute()).data or []:
+            items_by_order[item["order_id"]].append(item)
+    for order in orders:
+        order["items"] = items_by_order[order["order_id"]]
+    return orders
+
+async def get_order_by_id(order_id):
+    supabase = await get_client()
+    order_resp, items_resp = await asyncio.gather(
+        supabase.table("orders").select("*").eq("order_id", order_id).limit(1).execute(),
+        supabase.table("order_items").select("*").eq("order_id", order_id).execute(),
+    )
+    if not order_resp.data:
+        return None
+    order = order_resp.data[0]
+    order["items"] = items_resp.data
+    return order
+
+async def get_order_by_reservation_key(reservation_key):
+    supabase = await get_client()
+    order_resp = await supabase.table("orders").select("*").eq("reservation_key", reservation_key).limit(1).execute()
+    if not order_resp.data:
+        return None
+    return (await _attach_items(order_resp.data))[0]
+
+async def update_order(order_id, updates):
+    supabase = await get_client()
+    await supabase.table("orders").update(updates).eq("order_id", order_id).execute()
+    return await get_order_by_id(order_id)
+
+async def update_orders(order_ids, updates):
+    if not order_ids:
+        return []
+    supabase = await get_client()
+    resp = await supabase.table("orders").update(updates).in_("order_id", list(order_ids)).execute()
+    return resp.data or []
+
+async def get_orders_by_ids(order_ids):
+    ids = list(dict.fromkeys(order_ids))
+    if not ids:
+        return {}
+    supabase = await get_client()
+    orders = (await supabase.table("orders").select("*").in_("order_id", ids).execute()).data or []
+    return {o["order_id"]: o for o in await _attach_items(orders)}
+
+async def iter_orders(page_size=500):
+    supabase = await get_client()
+    after = None
+    while True:
+        query = supabase.table("orders").select("*")
+        if after is not None:
+            query = query.gt("order_id", after)
+        orders = (await query.order("order_id").limit(page_size).execute()).data or []
+        for o in await _attach_items(orders):
+            yield o
+        if len(orders) < page_size:
+            return
+        after = orders[-1]["order_id"]
+
+async def get_items_for_orders(order_ids):
+    grouped = {oid: [] for oid in order_ids}
+    if not grouped:
+        return grouped
+    supabase = await get_client()
+    resp = await supabase.table("order_items").select("*").in_("order_id", list(grouped)).execute()
+    for item in resp.data or []:
+        grouped.setdefault(item["order_id"], []).append(item)
+    return grouped
+
+async def _attach_items(orders):
+    items_by_order = await get_items_for_orders([o["order_id"] for o in orders])
+    for o in orders:
+        o["items"] = items_by_order.get(o["order_id"], [])
+    return orders
+
+async def list_orders_by_customer(cust_id):
+    supabase = await get_client()
+    orders = (await supabase.table("orders").select("*").eq("cust_id", cust_id).execute()).data or []
+    return await _attach_items(orders)
+
+async def list_orders_by_customer_page(cust_id, page_size=100, after=None):
+    supabase = await get_client()
+    query = supabase.table("orders").select("*").eq("cust_id", cust_id)
+    if after is not None:
+        query = query.gt("order_id", after)
+    orders = (await query.order("order_id").limit(page_size).execute()).data or []
+    await _attach_items(orders)
+    next_cursor = orders[-1]["order_id"] if len(orders) == page_size else None
+    return orders, next_cursor
+
+async def iter_orders_by_customer(cust_id, page_size=100):
+    after = None
+    while True:
+        orders, after = await list_orders_by_customer_page(cust_id, page_size, after)
+        for o in orders:
+            yield o
+        if after is None:
+            return
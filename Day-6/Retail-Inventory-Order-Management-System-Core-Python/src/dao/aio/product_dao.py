@@ -0,0 +1,115 @@
+from src.dao.aio.supabase_client import get_client
+from src.dao import cache
+from src.dao.aio.errors import write_rows
+from src.dao.product_dao import _product_payload, _projection
+
+async def create_products(products, on_conflict="error"):
+    if not products:
+        return []
+    supabase = await get_client()
+    rows = await write_rows(supabase.table("products"), products, "sku", on_conflict)
+    # the written rows carry every key (e.g. prod_id), so all aliases are dropped
+    written = {r.get("sku"): r for r in rows}
+    for p in products:
+        cache.invalidate("product", written.get(p["sku"]), sku=p["sku"])
+    return rows
+
+async def create_product(name, sku, price, stock=0, category=None):
+    rows = await create_products([_product_payload(name, sku, price, stock, category)])
+    return rows[0] if rows else None
+
+async def upsert_products(products):
+    return await create_products(products, on_conflict="update")
+
+async def update_product(prod_id, updates):
+    supabase = await get_client()
+    resp = await supabase.table("products").update(updates).eq("prod_id", prod_id).execute()
+    row = resp.data[0] if resp.data else None
+    cache.invalidate("product", row, prod_id=prod_id)
+    return row
+
+async def update_products(prod_ids, updates):
+    if not prod_ids:
+        return []
+    supabase = await get_client()
+    resp = await supabase.table("products").update(updates).in_("prod_id", list(prod_ids)).execute()
+    for pid in prod_ids:
+        cache.invalidate("product", prod_id=pid)
+    return resp.data or []
+
+async def _get_product_by(field, value):
+    row = cache.get("product", field, value)
+    if row is not None:
+        return row
+    supabase = await get_client()
+    resp = await supabase.table("products").select("*").eq(field, value).limit(1).execute()
+    row = resp.data[0] if resp.data else None
+    if row is not None:
+        cache.put("product", row)
+    return row
+
+async def get_product_by_id(prod_id):
+    return await _get_product_by("prod_id", prod_id)
+
+async def get_product_by_sku(sku):
+    return await _get_product_by("sku", sku)
+
+async def list_products(limit=100):
+    supabase = await get_client()
+    resp = await supabase.table("products").select("*").limit(limit).execute()
+    return resp.data or []
+
+async def list_products_page(page_size=1000, after=None, fields=None):
+    supabase = await get_client()
+    query = supabase.table("products").select(_projection(fields))
+    if after is not None:
+        query = query.gt("prod_id", after)
+    rows = (await query.order("prod_id").limit(page_size).execute()).data or []
+    next_cursor = rows[-1]["prod_id"] if len(rows) == page_size else None
+    return rows, next_cursor
+
+async def iter_products(page_size=1000, after=None, limit=None, fields=None):
+    while limit is None or limit > 0:
+        size = page_size if limit is None else min(page_size, limit)
+        rows, after = await list_products_page(size, after, fields)
+        for row in rows:
+            yield row
+        if limit is not None:
+            limit -= len(rows)
+        if after is None:
+            return
+
+async def get_products_by_ids(prod_ids):
+    found = {}
+    missing = []
+    for pid in dict.fromkeys(prod_ids):
+        row = cache.get("product", "prod_id", pid)
+        if row is not None:
+            found[pid] = row
+        else:
+            missing.append(pid)
+    if missing:
+        supabase = await get_client()
+        resp = await supabase.table("products").select("*").in_("prod_id", missing).execute()
+        for p in resp.data or []:
+            cache.put("product", p)
+            found[p["prod_id"]] = p
+    return found
+
+async def list_low_stock_page(threshold, page_size=1000, after=None):
+    supabase = await get_client()
+    query = supabase.table("products").select("*").lte("stock", threshold)
+    if after is not None:
+        query = query.gt("prod_id", after)
+    rows = (await query.order("prod_id").limit(page_size).execute()).data or []
+    next_cursor = rows[-1]["prod_id"] if len(rows) == page_size else None
+    return rows, next_cursor
+
+async def iter_low_stock(threshold, page_size=1000):
+    after = None
+    while True:
+        rows, after = await list_low_stock_page(threshold, page_size, after)
+        for row in rows:
+            yield row
+        if after is None:
+            return
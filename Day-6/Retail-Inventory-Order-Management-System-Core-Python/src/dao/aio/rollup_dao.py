@@ -0,0 +1,33 @@
+from src.dao.aio.supabase_client import get_client
+from src.dao.rollup_dao import COUNTERS, merge_deltas
+
+async def apply_rollups(deltas):
+    """Async twin of src.dao.rollup_dao.apply_rollups."""
+    if deltas:
+        supabase = await get_client()
+        await supabase.rpc("apply_revenue_rollups", {"deltas": deltas}).execute()
+
+async def get_rollup(dimension, dim_key):
+    supabase = await get_client()
+    resp = await (supabase.table("revenue_rollups").select("*")
+                  .eq("dimension", dimension).eq("dim_key", str(dim_key)).limit(1).execute())
+    return resp.data[0] if resp.data else None
+
+async def list_rollups(dimension, start=None, end=None, limit=1000):
+    supabase = await get_client()
+    query = supabase.table("revenue_rollups").select("*").eq("dimension", dimension)
+    if start is not None:
+        query = query.gte("dim_key", str(start))
+    if end is not None:
+        query = query.lte("dim_key", str(end))
+    return (await query.order("dim_key").limit(limit).execute()).data or []
+
+async def top_rollups(dimension, metric="revenue", limit=10):
+    supabase = await get_client()
+    resp = await (supabase.table("revenue_rollups").select("*").eq("dimension", dimension)
+                  .order(metric, desc=True).limit(limit).execute())
+    return resp.data or []
+
+async def clear_rollups():
+    supabase = await get_client()
+    await supabase.table("revenue_rollups").delete().neq("dimension", "").execute()
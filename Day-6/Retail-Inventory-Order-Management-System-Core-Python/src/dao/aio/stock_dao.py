@@ -0,0 +1,21 @@
+from src.dao.aio.supabase_client import get_client
+from src.dao.stock_dao import _merge_items, _invalidate_products
+
+async def reserve_stock(reservation_key, items):
+    supabase = await get_client()
+    merged = _merge_items(items)
+    res = await supabase.rpc("reserve_stock", {
+        "reservation_key": reservation_key,
+        "items": merged
+    }).execute()
+    _invalidate_products(merged)
+    return bool((res.data or {}).get("created"))
+
+async def release_stock(reservation_key, items=()):
+    supabase = await get_client()
+    res = await supabase.rpc("release_stock", {
+        "reservation_key": reservation_key,
+        "items": _merge_items(items)
+    }).execute()
+    _invalidate_products(res.data or [])
+    return res.data or []
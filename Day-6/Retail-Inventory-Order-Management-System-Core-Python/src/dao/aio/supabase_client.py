@@ -0,0 +1,31 @@
+# src/dao/aio/supabase_client.py
+"""
+One shared async Supabase client for the asyncio DAO modules.
+
+The client is created on first use and reused afterwards, so every coroutine
+goes through the same pooled PostgREST session (httpx with HTTP/2), and
+concurrent requests are multiplexed over one connection.
+"""
+import asyncio
+from supabase import acreate_client, AsyncClient
+from src.dao.supabase_client import SUPABASE_URL, SUPABASE_KEY
+
+_client = None
+_lock = None
+
+async def get_client() -> AsyncClient:
+    global _client, _lock
+    if _client is None:
+        if _lock is None:
+            _lock = asyncio.Lock()
+        async with _lock:
+            if _client is None:
+                _client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+async def close_client():
+    """Drop the shared client, e.g. before the event loop shuts down."""
+    global _client, _lock
+    client, _client, _lock = _client, None, None
+    if client is not None:
+        await client.postgrest.aclose()
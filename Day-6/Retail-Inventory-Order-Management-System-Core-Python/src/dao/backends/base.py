@@ -0,0 +1,252 @@
+# src/dao/backends/base.py
+"""
+Local storage backends for the retail DAO layer.
+
+A backend speaks the same query-builder subset as the supabase client, so the
+DAO modules run unchanged against it:
+
+    backend.table("products").select("*").eq("sku", sku).limit(1).execute().data
+    backend.rpc("reserve_stock", {...}).execute().data
+
+Subclasses implement execute(query), transaction() and adjust(); the RPCs from
+sql/*.sql are implemented once here on top of those primitives.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+# primary key, unique keys, secondary indexes and column defaults (values or callables)
+# of the retail schema
+TABLES = {
+    "customers": {"pk": "cust_id", "unique": [("email",)], "indexes": [], "defaults": {}},
+    "products": {"pk": "prod_id", "unique": [("sku",)], "indexes": ["stock"], "defaults": {"stock": 0}},
+    "orders": {
+        "pk": "order_id",
+        "unique": [("reservation_key",)],
+        "indexes": ["cust_id"],
+        "defaults": {"status": "PLACED", "order_date": _now_iso},
+    },
+    "order_items": {"pk": "item_id", "unique": [], "indexes": ["order_id"], "defaults": {}},
+    "revenue_rollups": {
+        "pk": None,
+        "unique": [("dimension", "dim_key")],
+        "indexes": ["dim_key"],
+        "defaults": {},
+    },
+    "stock_reservations": {
+        "pk": None,
+        "unique": [("reservation_key", "prod_id")],
+        "indexes": ["reservation_key"],
+        "defaults": {"status": "RESERVED"},
+    },
+}
+
+class BackendError(Exception):
+    """Mirrors postgrest's APIError: `code` carries the Postgres SQLSTATE."""
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+class Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class Query:
+    """
+    Records a PostgREST-style call chain and hands it to the backend on execute().
+    """
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.count = None
+        self.filters = []
+        self.order_by = []
+        self.limit_n = None
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+
+    def select(self, columns="*", count=None):
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, rows):
+        self.action = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.action = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values):
+        self.action = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    def order(self, column, desc=False):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        return self.backend.execute(self)
+
+    def conflict_columns(self):
+        if self.on_conflict:
+            return tuple(c.strip() for c in self.on_conflict.split(","))
+        return (TABLES[self.table]["pk"],)
+
+    def selected_columns(self):
+        """None for "*", otherwise the list of projected column names."""
+        if self.columns.strip() == "*":
+            return None
+        columns = [c.strip() for c in self.columns.split(",") if c.strip()]
+        for c in columns:
+            if not c.isidentifier():
+                raise BackendError(f"Unsupported select column for local backend: {c}", code="PGRST100")
+        return columns
+
+class RpcCall:
+    def __init__(self, backend, name, params):
+        self.backend = backend
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        return Response(self.backend.call_rpc(self.name, self.params))
+
+class Backend(ABC):
+    def table(self, name):
+        if name not in TABLES:
+            raise BackendError(f"relation \"{name}\" does not exist", code="42P01")
+        return Query(self, name)
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return RpcCall(self, name, params or {})
+
+    def call_rpc(self, name, params):
+        fn = getattr(self, "_rpc_" + name, None)
+        if fn is None:
+            raise BackendError(f"Could not find the function {name}", code="PGRST202")
+        with self.transaction():
+            return fn(**params)
+
+    # -------------------- primitives --------------------
+    @abstractmethod
+    def execute(self, query):
+        """Run a Query and return its rows."""
+
+    @abstractmethod
+    def transaction(self):
+        """Context manager; everything done inside commits or rolls back together."""
+
+    @abstractmethod
+    def adjust(self, table, key_column, key, column, delta, minimum=None):
+        """
+        Atomically add `delta` to `column` of one row; when `minimum` is given the
+        change is applied only if the result stays >= minimum. Returns True if applied.
+        """
+
+    # -------------------- RPCs (see sql/*.sql) --------------------
+    def _reservations(self, reservation_key):
+        return self.table("stock_reservations").select("*").eq("reservation_key", reservation_key).execute().data
+
+    def _rpc_reserve_stock(self, reservation_key, items):
+        created = not self._reservations(reservation_key)
+        if created:
+            for item in sorted(items, key=lambda i: i["prod_id"]):
+                if not self.adjust("products", "prod_id", item["prod_id"], "stock", -item["quantity"], minimum=0):
+                    raise BackendError(f"Not enough stock for product: {item['prod_id']}", code="P0001")
+                self.table("stock_reservations").insert({
+                    "reservation_key": reservation_key,
+                    "prod_id": item["prod_id"],
+                    "quantity": item["quantity"],
+                }).execute()
+        return {"created": created, "reservations": self._reservations(reservation_key)}
+
+    def _rpc_release_stock(self, reservation_key, items=()):
+        if not self._reservations(reservation_key) and items:
+            self.table("stock_reservations").insert([
+                {"reservation_key": reservation_key, "prod_id": i["prod_id"], "quantity": i["quantity"]}
+                for i in items
+            ]).execute()
+        for r in self._reservations(reservation_key):
+            if r["status"] == "RESERVED":
+                self.adjust("products", "prod_id", r["prod_id"], "stock", r["quantity"])
+        (self.table("stock_reservations").update({"status": "RELEASED"})
+            .eq("reservation_key", reservation_key).eq("status", "RESERVED").execute())
+        return self._reservations(reservation_key)
+
+    def _rpc_apply_revenue_rollups(self, deltas):
+        counters = ("orders", "units", "revenue", "completed_orders", "completed_revenue",
+                    "cancelled_orders", "cancelled_revenue")
+        for d in sorted(deltas, key=lambda d: (d["dimension"], d["dim_key"])):
+            rows = (self.table("revenue_rollups").select("*")
+                    .eq("dimension", d["dimension"]).eq("dim_key", d["dim_key"]).execute().data)
+            if rows:
+                values = {c: (rows[0].get(c) or 0) + d.get(c, 0) for c in counters}
+                (self.table("revenue_rollups").update(values)
+                    .eq("dimension", d["dimension"]).eq("dim_key", d["dim_key"]).execute())
+            else:
+                self.table("revenue_rollups").insert({
+                    "dimension": d["dimension"], "dim_key": d["dim_key"], **{c: d.get(c, 0) for c in counters}
+                }).execute()
+        return None
+
+    def _rpc_create_order_with_items(self, order_data, items):
+        order = self.table("orders").insert({
+            "cust_id": order_data.get("cust_id"),
+            "total_amount": order_data.get("total_amount"),
+            "reservation_key": order_data.get("reservation_key"),
+        }).execute().data[0]
+        rows = [{**i, "order_id": order["order_id"]} for i in items]
+        order["items"] = self.table("order_items").insert(rows).execute().data if rows else []
+        return order
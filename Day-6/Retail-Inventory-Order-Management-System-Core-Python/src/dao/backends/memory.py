@@ -0,0 +1,215 @@
+# src/dao/backends/memory.py
+import itertools
+import threading
+from contextlib import contextmanager
+
+from src.dao.backends.base import Backend, BackendError, Response, TABLES
+
+def _matches(row, op, column, value):
+    v = row.get(column)
+    if op == "eq":
+        return v == value
+    if op == "neq":
+        return v != value
+    if op == "in":
+        return v in value
+    if op == "is":
+        return v is None if value is None else v == value
+    if v is None:
+        return False
+    if op == "gt":
+        return v > value
+    if op == "gte":
+        return v >= value
+    if op == "lt":
+        return v < value
+    if op == "lte":
+        return v <= value
+    raise BackendError(f"Unsupported filter: {op}", code="PGRST100")
+
+class _Table:
+    def __init__(self, name):
+        spec = TABLES[name]
+        self.name = name
+        self.pk = spec["pk"]
+        self.unique = spec["unique"]
+        self.defaults = spec["defaults"]
+        self.rows = {}  # internal row id -> row
+        self.ids = itertools.count(1)
+        self.rids = itertools.count(1)
+        indexed = set(spec["indexes"]) | {cols[0] for cols in self.unique}
+        if self.pk:
+            indexed.add(self.pk)
+        self.indexes = {col: {} for col in indexed}
+
+    def index_add(self, rid, row):
+        for col, idx in self.indexes.items():
+            idx.setdefault(row.get(col), set()).add(rid)
+
+    def index_remove(self, rid, row):
+        for col, idx in self.indexes.items():
+            bucket = idx.get(row.get(col))
+            if bucket:
+                bucket.discard(rid)
+                if not bucket:
+                    del idx[row.get(col)]
+
+    def find(self, columns, row):
+        """Internal id of the row equal to `row` on `columns`, if any."""
+        for rid in self.indexes.get(columns[0], {}).get(row.get(columns[0]), ()):
+            if all(self.rows[rid].get(c) == row.get(c) for c in columns):
+                return rid
+        return None
+
+    def candidates(self, filters):
+        # narrow with the most selective eq/in filter on an indexed column
+        best = None
+        for op, column, value in filters:
+            if column in self.indexes and op in ("eq", "in"):
+                idx = self.indexes[column]
+                values = [value] if op == "eq" else value
+                found = set().union(*(idx.get(v, ()) for v in values)) if values else set()
+                if best is None or len(found) < len(best):
+                    best = found
+        return self.rows.keys() if best is None else best
+
+class MemoryBackend(Backend):
+    """
+    Pure in-memory backend. One lock serialises all access; transactions keep an
+    undo journal so a failing RPC leaves no partial writes behind.
+    """
+    def __init__(self):
+        self._tables = {name: _Table(name) for name in TABLES}
+        self._lock = threading.RLock()
+        self._journal = None
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._journal is not None:
+                yield
+                return
+            self._journal = []
+            try:
+                yield
+            except BaseException:
+                for undo in reversed(self._journal):
+                    undo()
+                raise
+            finally:
+                self._journal = None
+
+    def _log(self, undo):
+        if self._journal is not None:
+            self._journal.append(undo)
+
+    # -------------------- row-level writes --------------------
+    def _insert(self, t, row):
+        row = dict(row)
+        for col, default in t.defaults.items():
+            if row.get(col) is None:
+                row[col] = default() if callable(default) else default
+        if t.pk and row.get(t.pk) is None:
+            row[t.pk] = next(t.ids)
+        for columns in t.unique + ([(t.pk,)] if t.pk else []):
+            if all(row.get(c) is not None for c in columns) and t.find(columns, row) is not None:
+                raise BackendError(
+                    f"duplicate key value violates unique constraint \"{t.name}_{'_'.join(columns)}_key\"",
+                    code="23505",
+                )
+        rid = next(t.rids)
+        t.rows[rid] = row
+        t.index_add(rid, row)
+        self._log(lambda: self._remove(t, rid))
+        return row
+
+    def _remove(self, t, rid):
+        row = t.rows.pop(rid)
+        t.index_remove(rid, row)
+        return row
+
+    def _restore(self, t, rid, row):
+        t.rows[rid] = row
+        t.index_add(rid, row)
+
+    def _update(self, t, rid, values):
+        old = t.rows[rid]
+        new = {**old, **values}
+        t.index_remove(rid, old)
+        t.rows[rid] = new
+        t.index_add(rid, new)
+
+        def undo():
+            t.index_remove(rid, t.rows[rid])
+            self._restore(t, rid, old)
+        self._log(undo)
+        return new
+
+    # -------------------- query execution --------------------
+    def _select_ids(self, t, query):
+        ids = [rid for rid in t.candidates(query.filters)
+               if all(_matches(t.rows[rid], *f) for f in query.filters)]
+        ids.sort()
+        for column, desc in reversed(query.order_by):
+            present = [r for r in ids if t.rows[r].get(column) is not None]
+            missing = [r for r in ids if t.rows[r].get(column) is None]
+            present.sort(key=lambda r: t.rows[r][column], reverse=desc)
+            ids = present + missing
+        return ids
+
+    def _project(self, rows, query):
+        columns = query.selected_columns()
+        if columns is None:
+            return [dict(r) for r in rows]
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    def execute(self, query):
+        t = self._tables[query.table]
+        with self.transaction():
+            if query.action == "select":
+                ids = self._select_ids(t, query)
+                count = len(ids) if query.count else None
+                if query.limit_n is not None:
+                    ids = ids[:query.limit_n]
+                return Response(self._project([t.rows[r] for r in ids], query), count)
+            if query.action == "insert":
+                return Response([dict(self._insert(t, row)) for row in query.payload])
+            if query.action == "upsert":
+                columns = query.conflict_columns()
+                written = []
+                for row in query.payload:
+                    rid = t.find(columns, row)
+                    if rid is None:
+                        written.append(dict(self._insert(t, row)))
+                    elif not query.ignore_duplicates:
+                        written.append(dict(self._update(t, rid, row)))
+                return Response(written)
+            ids = self._select_ids(t, query)
+            if query.action == "update":
+                return Response([dict(self._update(t, rid, query.payload)) for rid in ids])
+            if query.action == "delete":
+                removed = []
+                for rid in ids:
+                    row = self._remove(t, rid)
+                    self._log(lambda rid=rid, row=row: self._restore(t, rid, row))
+                    removed.append(dict(row))
+                return Response(removed)
+        raise BackendError(f"Unsupported action: {query.action}")
+
+    def adjust(self, table, key_column, key, column, delta, minimum=None):
+        t = self._tables[table]
+        with self.transaction():
+            if key_column in t.indexes:
+                rids = list(t.indexes[key_column].get(key, ()))
+            else:
+                rids = list(t.rows)
+            for rid in rids:
+                row = t.rows[rid]
+                if row.get(key_column) != key:
+                    continue
+                value = (row.get(column) or 0) + delta
+                if minimum is not None and value < minimum:
+                    return False
+                self._update(t, rid, {column: value})
+                return True
+        return False
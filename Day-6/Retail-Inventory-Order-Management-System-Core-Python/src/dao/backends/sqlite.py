@@ -0,0 +1,208 @@
+# src/dao/backends/sqlite.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from src.dao.backends.base import Backend, BackendError, Response
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    cust_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    email TEXT NOT NULL UNIQUE,
+    phone TEXT,
+    city TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS products (
+    prod_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    sku TEXT NOT NULL UNIQUE,
+    price REAL NOT NULL,
+    stock INTEGER NOT NULL DEFAULT 0,
+    category TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_products_stock_prod_id ON products (stock, prod_id);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cust_id INTEGER REFERENCES customers (cust_id),
+    order_date TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    total_amount REAL,
+    status TEXT NOT NULL DEFAULT 'PLACED',
+    reservation_key TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_orders_cust_id_order_id ON orders (cust_id, order_id);
+CREATE TABLE IF NOT EXISTS order_items (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders (order_id),
+    prod_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id);
+CREATE TABLE IF NOT EXISTS revenue_rollups (
+    dimension TEXT NOT NULL,
+    dim_key TEXT NOT NULL,
+    orders INTEGER NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0,
+    completed_orders INTEGER NOT NULL DEFAULT 0,
+    completed_revenue REAL NOT NULL DEFAULT 0,
+    cancelled_orders INTEGER NOT NULL DEFAULT 0,
+    cancelled_revenue REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, dim_key)
+);
+CREATE INDEX IF NOT EXISTS idx_revenue_rollups_revenue ON revenue_rollups (dimension, revenue DESC);
+CREATE TABLE IF NOT EXISTS stock_reservations (
+    reservation_key TEXT NOT NULL,
+    prod_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL CHECK (quantity > 0),
+    status TEXT NOT NULL DEFAULT 'RESERVED',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (reservation_key, prod_id)
+);
+"""
+
+_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+def _ident(name):
+    if not name.isidentifier():
+        raise BackendError(f"Invalid identifier: {name}", code="42602")
+    return f'"{name}"'
+
+def _where(filters):
+    clauses, params = [], []
+    for op, column, value in filters:
+        col = _ident(column)
+        if op in _OPS:
+            clauses.append(f"{col} {_OPS[op]} ?")
+            params.append(value)
+        elif op == "in":
+            if not value:
+                clauses.append("0")
+            else:
+                clauses.append(f"{col} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+        elif op == "is":
+            clauses.append(f"{col} IS ?")
+            params.append(value)
+        else:
+            raise BackendError(f"Unsupported filter: {op}", code="PGRST100")
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def _translate(error):
+    message = str(error)
+    if "UNIQUE" in message:
+        code = "23505"
+    elif "NOT NULL" in message:
+        code = "23502"
+    elif "FOREIGN KEY" in message:
+        code = "23503"
+    elif "CHECK" in message:
+        code = "23514"
+    else:
+        code = "23000"
+    return BackendError(message, code=code)
+
+class SQLiteBackend(Backend):
+    """
+    Embedded SQLite backend (WAL journal, indexes matching sql/*.sql).
+    Each thread gets its own connection; transactions use BEGIN IMMEDIATE.
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._conn()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def _run(self, sql, params=()):
+        try:
+            return [dict(r) for r in self._conn().execute(sql, params)]
+        except sqlite3.IntegrityError as e:
+            raise _translate(e) from e
+
+    def execute(self, query):
+        table = _ident(query.table)
+        where, params = _where(query.filters)
+        if query.action == "select":
+            columns = query.selected_columns()
+            cols = "*" if columns is None else ", ".join(_ident(c) for c in columns)
+            sql = f"SELECT {cols} FROM {table}{where}"
+            if query.order_by:
+                sql += " ORDER BY " + ", ".join(f"{_ident(c)}{' DESC' if d else ''}" for c, d in query.order_by)
+            if query.limit_n is not None:
+                sql += f" LIMIT {int(query.limit_n)}"
+            count = None
+            if query.count:
+                count = self._run(f"SELECT COUNT(*) AS n FROM {table}{where}", params)[0]["n"]
+            return Response(self._run(sql, params), count)
+        if query.action in ("insert", "upsert"):
+            written = []
+            with self.transaction():
+                for row in query.payload:
+                    cols = list(row)
+                    sql = (f"INSERT INTO {table} ({', '.join(_ident(c) for c in cols)}) "
+                           f"VALUES ({', '.join('?' * len(cols))})")
+                    if query.action == "upsert":
+                        target = ", ".join(_ident(c) for c in query.conflict_columns())
+                        updates = [c for c in cols if c not in query.conflict_columns()]
+                        if query.ignore_duplicates or not updates:
+                            sql += f" ON CONFLICT ({target}) DO NOTHING"
+                        else:
+                            sql += (f" ON CONFLICT ({target}) DO UPDATE SET "
+                                    + ", ".join(f"{_ident(c)} = excluded.{_ident(c)}" for c in updates))
+                    written += self._run(sql + " RETURNING *", [row[c] for c in cols])
+            return Response(written)
+        if query.action == "update":
+            cols = list(query.payload)
+            sets = ", ".join(f"{_ident(c)} = ?" for c in cols)
+            return Response(self._run(f"UPDATE {table} SET {sets}{where} RETURNING *",
+                                      [query.payload[c] for c in cols] + params))
+        if query.action == "delete":
+            return Response(self._run(f"DELETE FROM {table}{where} RETURNING *", params))
+        raise BackendError(f"Unsupported action: {query.action}")
+
+    def adjust(self, table, key_column, key, column, delta, minimum=None):
+        col = _ident(column)
+        sql = f"UPDATE {_ident(table)} SET {col} = {col} + ? WHERE {_ident(key_column)} = ?"
+        params = [delta, key]
+        if minimum is not None:
+            sql += f" AND {col} + ? >= ?"
+            params += [delta, minimum]
+        return self._conn().execute(sql, params).rowcount > 0
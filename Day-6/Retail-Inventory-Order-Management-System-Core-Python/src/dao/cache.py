@@ -0,0 +1,168 @@
+# src/dao/cache.py
+"""
+Read-through cache for the hottest DAO lookups (products by prod_id/sku,
+customers by cust_id/email).
+
+The default backend is an in-process LRU with a TTL. Set DAO_CACHE_REDIS_URL
+(or call configure(RedisCache(...))) to share entries between processes.
+DAO write paths call invalidate() so readers never see their own stale writes.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DAO_CACHE_TTL = float(os.getenv("DAO_CACHE_TTL", "60"))
+DAO_CACHE_SIZE = int(os.getenv("DAO_CACHE_SIZE", "10000"))
+DAO_CACHE_REDIS_URL = os.getenv("DAO_CACHE_REDIS_URL")
+
+# every field a cached row is reachable by, per namespace
+INDEXED_FIELDS = {
+    "product": ("prod_id", "sku"),
+    "customer": ("cust_id", "email"),
+}
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with a per-entry time to live. Rows are
+    copied in and out, so a caller mutating the row it got back (e.g. the
+    unit of work's identity map) never changes the cached copy.
+    """
+    def __init__(self, maxsize=DAO_CACHE_SIZE, ttl=DAO_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return dict(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RedisCache:
+    """
+    Shared backend storing JSON rows in Redis. Requires `pip install redis`.
+    """
+    def __init__(self, url=DAO_CACHE_REDIS_URL, ttl=DAO_CACHE_TTL, prefix="retail:"):
+        import redis  # optional dependency
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value, default=str), ex=max(1, int(self.ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + k for k in keys))
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+_backend = RedisCache() if DAO_CACHE_REDIS_URL else LRUCache()
+_stats = {}
+_stats_lock = threading.Lock()
+
+def configure(backend):
+    """Swap the cache backend (e.g. LRUCache(ttl=5) or RedisCache(url))."""
+    global _backend
+    _backend = backend
+
+def _count(namespace, field):
+    with _stats_lock:
+        counters = _stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+        counters[field] += 1
+
+def key(namespace, field, value):
+    return f"{namespace}:{field}:{value}"
+
+def get(namespace, field, value):
+    """Return the cached row or None, counting a hit or a miss."""
+    row = _backend.get(key(namespace, field, value))
+    if row is _MISSING:
+        _count(namespace, "misses")
+        return None
+    _count(namespace, "hits")
+    return row
+
+def put(namespace, row):
+    """Cache `row` under each of its indexed fields (e.g. prod_id and sku)."""
+    for field in INDEXED_FIELDS[namespace]:
+        if row.get(field) is not None:
+            _backend.set(key(namespace, field, row[field]), row)
+
+def get_or_load(namespace, field, value, loader):
+    """
+    Read-through lookup: return the cached row or call loader() and cache
+    its result. None results are not cached.
+    """
+    row = get(namespace, field, value)
+    if row is not None:
+        return row
+    row = loader()
+    if row is not None:
+        put(namespace, row)
+    return row
+
+def invalidate(namespace, row=None, **fields):
+    """
+    Drop every cached key of a row. Pass the row itself and/or field=value
+    pairs; a cached copy found under a given field is dropped under all of its keys.
+    """
+    rows = [row] if row else []
+    keys = []
+    for field, value in fields.items():
+        if value is None:
+            continue
+        keys.append(key(namespace, field, value))
+        cached = _backend.get(keys[-1])
+        if cached is not _MISSING:
+            rows.append(cached)
+    for r in rows:
+        keys += [key(namespace, f, r[f]) for f in INDEXED_FIELDS[namespace] if r.get(f) is not None]
+    if keys:
+        _backend.delete(*dict.fromkeys(keys))
+        _count(namespace, "invalidations")
+
+def clear():
+    _backend.clear()
+
+def get_stats():
+    """Hit/miss/invalidation counters per namespace."""
+    with _stats_lock:
+        return {ns: dict(c) for ns, c in _stats.items()}
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -1,19 +1,70 @@
 from src.dao.supabase_client import supabase
+from src.dao import cache
+from src.dao.errors import write_rows
+
+def create_customers(customers, on_conflict="error"):
+    """
+    Insert many customers in one request and return the written rows.
+    on_conflict ("error" | "update" | "ignore") decides what happens to an existing email;
+    "error" raises DuplicateKeyError.
+    """
+    if not customers:
+        return []
+    rows = write_rows(supabase.table("customers"), customers, "email", on_conflict)
+    # the written rows carry every key (e.g. cust_id), so all aliases are dropped
+    written = {r.get("email"): r for r in rows}
+    for c in customers:
+        cache.invalidate("customer", written.get(c["email"]), email=c["email"])
+    return rows
 
 def create_customer(name, email, phone, city=None):
-    existing = supabase.table("customers").select("*").eq("email", email).execute()
-    if existing.data:
-        raise Exception("Email already exists")
     payload = {"name": name, "email": email, "phone": phone}
     if city:
         payload["city"] = city
-    supabase.table("customers").insert(payload).execute()
-    resp = supabase.table("customers").select("*").eq("email", email).limit(1).execute()
-    return resp.data[0] if resp.data else None
+    rows = create_customers([payload])
+    return rows[0] if rows else None
 
 def get_customer_by_id(cust_id):
-    resp = supabase.table("customers").select("*").eq("cust_id", cust_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
+    def load():
+        resp = supabase.table("customers").select("*").eq("cust_id", cust_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+    return cache.get_or_load("customer", "cust_id", cust_id, load)
+
+def get_customer_by_email(email):
+    def load():
+        resp = supabase.table("customers").select("*").eq("email", email).limit(1).execute()
+        return resp.data[0] if resp.data else None
+    return cache.get_or_load("customer", "email", email, load)
+
+def get_customers_by_ids(cust_ids):
+    """
+    Fetch many customers, serving what it can from the cache and loading
+    the rest in one query. Returns a dict of cust_id -> customer.
+    """
+    found = {}
+    missing = []
+    for cid in dict.fromkeys(cust_ids):
+        row = cache.get("customer", "cust_id", cid)
+        if row is not None:
+            found[cid] = row
+        else:
+            missing.append(cid)
+    if missing:
+        resp = supabase.table("customers").select("*").in_("cust_id", missing).execute()
+        for c in resp.data or []:
+            cache.put("customer", c)
+            found[c["cust_id"]] = c
+    return found
+
+def get_existing_emails(emails):
+    """
+    Return the subset of emails that already belong to a customer, in one
+    query on the unique email index.
+    """
+    if not emails:
+        return set()
+    resp = supabase.table("customers").select("email").in_("email", list(emails)).execute()
+    return {c["email"] for c in resp.data or []}
 
 def list_customers(limit=100):
     resp = supabase.table("customers").select("*").limit(limit).execute()
@@ -0,0 +1,27 @@
+# src/dao/errors.py
+class DuplicateKeyError(Exception):
+    """Raised by DAO writes that hit a unique constraint (e.g. products.sku, customers.email)."""
+    pass
+
+def is_unique_violation(exc) -> bool:
+    # postgrest APIError carries the Postgres SQLSTATE in .code
+    return getattr(exc, "code", None) == "23505" or "duplicate key" in str(exc)
+
+def write_rows(table, rows, conflict_column, on_conflict="error"):
+    """
+    Write rows in one request and return the rows the database wrote.
+    on_conflict: "error" raises DuplicateKeyError, "update" overwrites the
+    existing row, "ignore" keeps it (only new rows are returned).
+    """
+    if on_conflict == "error":
+        query = table.insert(rows)
+    elif on_conflict in ("update", "ignore"):
+        query = table.upsert(rows, on_conflict=conflict_column, ignore_duplicates=on_conflict == "ignore")
+    else:
+        raise ValueError(f"on_conflict must be error, update or ignore, not {on_conflict!r}")
+    try:
+        return query.execute().data or []
+    except Exception as e:
+        if is_unique_violation(e):
+            raise DuplicateKeyError(f"{conflict_column} already exists: {e}") from e
+        raise
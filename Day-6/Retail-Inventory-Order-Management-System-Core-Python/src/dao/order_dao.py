@@ -1,6 +1,26 @@
 from src.dao.supabase_client import supabase
 
-def create_order(order_data, items):
+def _item_payloads(order_id, items):
+    return [
+        {
+            "order_id": order_id,
+            "prod_id": item["prod_id"],
+            "quantity": item["quantity"],
+            "price": item["price"]
+        }
+        for item in items
+    ]
+
+def create_order(order_data, items, atomic=False):
+    """
+    Insert an order and all of its items.
+    Items go in as one bulk insert and the returned rows are used directly.
+    With atomic=True the header and items are written by the
+    create_order_with_items RPC (sql/create_order_with_items.sql) in one call.
+    """
+    if atomic:
+        return create_order_atomic(order_data, items)
+
     # insert order
     res = supabase.table("orders").insert(order_data).execute()
     order = res.data[0] if res.data else None
@@ -8,21 +28,51 @@ def create_order(order_data, items):
         raise Exception("Failed to create order")
     order_id = order["order_id"]
 
-    # insert items
-    for item in items:
-        payload = {
-            "order_id": order_id,
-            "prod_id": item["prod_id"],
-            "quantity": item["quantity"],
-            "price": item["price"]
-        }
-        supabase.table("order_items").insert(payload).execute()
+    # insert items in one request; the response already holds the written rows
+    payloads = _item_payloads(order_id, items)
+    order["items"] = supabase.table("order_items").insert(payloads).execute().data if payloads else []
+    return order
 
-    # return full order
-    order_items = supabase.table("order_items").select("*").eq("order_id", order_id).execute().data
-    order["items"] = order_items
+def create_order_atomic(order_data, items):
+    res = supabase.rpc("create_order_with_items", {
+        "order_data": order_data,
+        "items": _item_payloads(None, items)
+    }).execute()
+    order = res.data
+    if isinstance(order, list):
+        order = order[0] if order else None
+    if not order:
+        raise Exception("Failed to create order")
     return order
 
+def create_orders(entries):
+    """
+    Insert many orders with their items in two requests: every header in one
+    bulk insert, then every item of every order in another.
+    `entries` is a list of (order_data, items); returns the orders in the same order.
+    """
+    if not entries:
+        return []
+    res = supabase.table("orders").insert([order_data for order_data, _ in entries]).execute()
+    orders = res.data or []
+    if len(orders) != len(entries):
+        raise Exception("Failed to create orders")
+    keys = [order_data.get("reservation_key") for order_data, _ in entries]
+    if all(keys):
+        # match by key rather than trusting the response order
+        by_key = {o["reservation_key"]: o for o in orders}
+        orders = [by_key[k] for k in keys]
+    payloads = []
+    for order, (_, items) in zip(orders, entries):
+        payloads += _item_payloads(order["order_id"], items)
+    items_by_order = {o["order_id"]: [] for o in orders}
+    if payloads:
+        for item in supabase.table("order_items").insert(payloads).execute().data or []:
+            items_by_order[item["order_id"]].append(item)
+    for order in orders:
+        order["items"] = items_by_order[order["order_id"]]
+    return orders
+
 def get_order_by_id(order_id):
     order_resp = supabase.table("orders").select("*").eq("order_id", order_id).limit(1).execute()
     if not order_resp.data:
@@ -32,13 +82,93 @@ def get_order_by_id(order_id):
     order["items"] = items
     return order
 
+def get_order_by_reservation_key(reservation_key):
+    order_resp = supabase.table("orders").select("*").eq("reservation_key", reservation_key).limit(1).execute()
+    if not order_resp.data:
+        return None
+    return _attach_items(order_resp.data)[0]
+
 def update_order(order_id, updates):
     supabase.table("orders").update(updates).eq("order_id", order_id).execute()
     return get_order_by_id(order_id)
 
-def list_orders_by_customer(cust_id):
-    orders = supabase.table("orders").select("*").eq("cust_id", cust_id).execute().data
+def update_orders(order_ids, updates):
+    """
+    Apply the same updates to many orders in one request. Returns the updated headers.
+    """
+    if not order_ids:
+        return []
+    resp = supabase.table("orders").update(updates).in_("order_id", list(order_ids)).execute()
+    return resp.data or []
+
+def get_orders_by_ids(order_ids):
+    """
+    Fetch many orders with their items in two queries. Returns a dict of order_id -> order.
+    """
+    ids = list(dict.fromkeys(order_ids))
+    if not ids:
+        return {}
+    orders = supabase.table("orders").select("*").in_("order_id", ids).execute().data or []
+    return {o["order_id"]: o for o in _attach_items(orders)}
+
+def iter_orders(page_size=500):
+    """
+    Yield every order (with items) ordered by order_id, one page at a time.
+    """
+    after = None
+    while True:
+        query = supabase.table("orders").select("*")
+        if after is not None:
+            query = query.gt("order_id", after)
+        orders = query.order("order_id").limit(page_size).execute().data or []
+        yield from _attach_items(orders)
+        if len(orders) < page_size:
+            return
+        after = orders[-1]["order_id"]
+
+def get_items_for_orders(order_ids):
+    """
+    Fetch the items of many orders in one query.
+    Returns a dict of order_id -> list of items (every requested id is present).
+    """
+    grouped = {oid: [] for oid in order_ids}
+    if not grouped:
+        return grouped
+    resp = supabase.table("order_items").select("*").in_("order_id", list(grouped)).execute()
+    for item in resp.data or []:
+        grouped.setdefault(item["order_id"], []).append(item)
+    return grouped
+
+def _attach_items(orders):
+    items_by_order = get_items_for_orders([o["order_id"] for o in orders])
     for o in orders:
-        items = supabase.table("order_items").select("*").eq("order_id", o["order_id"]).execute().data
-        o["items"] = items
+        o["items"] = items_by_order.get(o["order_id"], [])
     return orders
+
+def list_orders_by_customer(cust_id):
+    orders = supabase.table("orders").select("*").eq("cust_id", cust_id).execute().data or []
+    return _attach_items(orders)
+
+def list_orders_by_customer_page(cust_id, page_size=100, after=None):
+    """
+    Return one page of a customer's orders (with items) ordered by order_id.
+    Pass the returned cursor as `after` to get the next page; it is None on the last page.
+    """
+    query = supabase.table("orders").select("*").eq("cust_id", cust_id)
+    if after is not None:
+        query = query.gt("order_id", after)
+    orders = query.order("order_id").limit(page_size).execute().data or []
+    _attach_items(orders)
+    next_cursor = orders[-1]["order_id"] if len(orders) == page_size else None
+    return orders, next_cursor
+
+def iter_orders_by_customer(cust_id, page_size=100):
+    """
+    Yield a customer's orders one at a time, fetching them page by page.
+    """
+    after = None
+    while True:
+        orders, after = list_orders_by_customer_page(cust_id, page_size, after)
+        yield from orders
+        if after is None:
+            return
@@ -1,17 +1,138 @@
 from src.dao.supabase_client import supabase
+from src.dao import cache
+from src.dao.errors import write_rows
 
-def create_product(name, sku, price, stock=0, category=None):
+def _product_payload(name, sku, price, stock=0, category=None):
     payload = {"name": name, "sku": sku, "price": price, "stock": stock}
     if category:
         payload["category"] = category
-    supabase.table("products").insert(payload).execute()
-    resp = supabase.table("products").select("*").eq("sku", sku).limit(1).execute()
-    return resp.data[0] if resp.data else None
+    return payload
+
+def create_products(products, on_conflict="error"):
+    """
+    Insert many products in one request and return the written rows.
+    on_conflict ("error" | "update" | "ignore") decides what happens to an existing sku;
+    "error" raises DuplicateKeyError.
+    """
+    if not products:
+        return []
+    rows = write_rows(supabase.table("products"), products, "sku", on_conflict)
+    # the written rows carry every key (e.g. prod_id), so all aliases are dropped
+    written = {r.get("sku"): r for r in rows}
+    for p in products:
+        cache.invalidate("product", written.get(p["sku"]), sku=p["sku"])
+    return rows
+
+def create_product(name, sku, price, stock=0, category=None):
+    rows = create_products([_product_payload(name, sku, price, stock, category)])
+    return rows[0] if rows else None
+
+def update_product(prod_id, updates):
+    resp = supabase.table("products").update(updates).eq("prod_id", prod_id).execute()
+    row = resp.data[0] if resp.data else None
+    cache.invalidate("product", row, prod_id=prod_id)
+    return row
+
+def upsert_products(products):
+    """
+    Insert or update many products keyed on sku in one request.
+    Returns the written rows.
+    """
+    return create_products(products, on_conflict="update")
+
+def update_products(prod_ids, updates):
+    """
+    Apply the same updates to many products in one request. Returns the updated rows.
+    """
+    if not prod_ids:
+        return []
+    resp = supabase.table("products").update(updates).in_("prod_id", list(prod_ids)).execute()
+    for pid in prod_ids:
+        cache.invalidate("product", prod_id=pid)
+    return resp.data or []
 
 def get_product_by_id(prod_id):
-    resp = supabase.table("products").select("*").eq("prod_id", prod_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
+    def load():
+        resp = supabase.table("products").select("*").eq("prod_id", prod_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+    return cache.get_or_load("product", "prod_id", prod_id, load)
+
+def get_product_by_sku(sku):
+    def load():
+        resp = supabase.table("products").select("*").eq("sku", sku).limit(1).execute()
+        return resp.data[0] if resp.data else None
+    return cache.get_or_load("product", "sku", sku, load)
 
 def list_products(limit=100):
     resp = supabase.table("products").select("*").limit(limit).execute()
     return resp.data or []
+
+def _projection(fields):
+    # keyset paging needs prod_id, so it is always selected
+    if not fields:
+        return "*"
+    return ",".join(dict.fromkeys(["prod_id", *fields]))
+
+def list_products_page(page_size=1000, after=None, fields=None):
+    query = supabase.table("products").select(_projection(fields))
+    if after is not None:
+        query = query.gt("prod_id", after)
+    rows = query.order("prod_id").limit(page_size).execute().data or []
+    next_cursor = rows[-1]["prod_id"] if len(rows) == page_size else None
+    return rows, next_cursor
+
+def iter_products(page_size=1000, after=None, limit=None, fields=None):
+    """
+    Yield the catalog ordered by prod_id, one page in memory at a time.
+    Starts after the given prod_id, stops after limit rows, and selects
+    only the given columns (plus prod_id) when fields is set.
+    """
+    while limit is None or limit > 0:
+        size = page_size if limit is None else min(page_size, limit)
+        rows, after = list_products_page(size, after, fields)
+        yield from rows
+        if limit is not None:
+            limit -= len(rows)
+        if after is None:
+            return
+
+def get_products_by_ids(prod_ids):
+    """
+    Fetch many products, serving what it can from the cache and loading
+    the rest in one query. Returns a dict of prod_id -> product.
+    """
+    found = {}
+    missing = []
+    for pid in dict.fromkeys(prod_ids):
+        row = cache.get("product", "prod_id", pid)
+        if row is not None:
+            found[pid] = row
+        else:
+            missing.append(pid)
+    if missing:
+        resp = supabase.table("products").select("*").in_("prod_id", missing).execute()
+        for p in resp.data or []:
+            cache.put("product", p)
+            found[p["prod_id"]] = p
+    return found
+
+def list_low_stock_page(threshold, page_size=1000, after=None):
+    """
+    One page of products with stock <= threshold, filtered by the database and
+    ordered by prod_id (see sql/low_stock.sql for the supporting index).
+    Pass the returned cursor as `after` for the next page; it is None on the last page.
+    """
+    query = supabase.table("products").select("*").lte("stock", threshold)
+    if after is not None:
+        query = query.gt("prod_id", after)
+    rows = query.order("prod_id").limit(page_size).execute().data or []
+    next_cursor = rows[-1]["prod_id"] if len(rows) == page_size else None
+    return rows, next_cursor
+
+def iter_low_stock(threshold, page_size=1000):
+    after = None
+    while True:
+        rows, after = list_low_stock_page(threshold, page_size, after)
+        yield from rows
+        if after is None:
+            return
@@ -0,0 +1,44 @@
+from src.dao.supabase_client import supabase
+
+COUNTERS = ("orders", "units", "revenue", "completed_orders", "completed_revenue",
+            "cancelled_orders", "cancelled_revenue")
+
+def merge_deltas(deltas):
+    """Sum deltas that hit the same rollup row so each row is written once."""
+    merged = {}
+    for d in deltas:
+        row = merged.setdefault((d["dimension"], d["dim_key"]), {"dimension": d["dimension"], "dim_key": d["dim_key"]})
+        for counter in COUNTERS:
+            if counter in d:
+                row[counter] = row.get(counter, 0) + d[counter]
+    return list(merged.values())
+
+def apply_rollups(deltas):
+    """
+    Add counter deltas ({"dimension", "dim_key", <counter>: n, ...}) to their
+    rollup rows in one call (sql/revenue_rollups.sql).
+    """
+    if deltas:
+        supabase.rpc("apply_revenue_rollups", {"deltas": deltas}).execute()
+
+def get_rollup(dimension, dim_key):
+    resp = (supabase.table("revenue_rollups").select("*")
+            .eq("dimension", dimension).eq("dim_key", str(dim_key)).limit(1).execute())
+    return resp.data[0] if resp.data else None
+
+def list_rollups(dimension, start=None, end=None, limit=1000):
+    """Rollups of one dimension ordered by key, optionally within [start, end]."""
+    query = supabase.table("revenue_rollups").select("*").eq("dimension", dimension)
+    if start is not None:
+        query = query.gte("dim_key", str(start))
+    if end is not None:
+        query = query.lte("dim_key", str(end))
+    return query.order("dim_key").limit(limit).execute().data or []
+
+def top_rollups(dimension, metric="revenue", limit=10):
+    resp = (supabase.table("revenue_rollups").select("*").eq("dimension", dimension)
+            .order(metric, desc=True).limit(limit).execute())
+    return resp.data or []
+
+def clear_rollups():
+    supabase.table("revenue_rollups").delete().neq("dimension", "").execute()
@@ -0,0 +1,41 @@
+from src.dao.supabase_client import supabase
+from src.dao import cache
+
+def _merge_items(items):
+    # one conditional decrement per product, so repeated lines are summed
+    merged = {}
+    for item in items:
+        merged[item["prod_id"]] = merged.get(item["prod_id"], 0) + item["quantity"]
+    return [{"prod_id": pid, "quantity": qty} for pid, qty in sorted(merged.items())]
+
+def _invalidate_products(rows):
+    # stock changed server-side, so cached product rows are stale
+    for row in rows:
+        cache.invalidate("product", prod_id=row["prod_id"])
+
+def reserve_stock(reservation_key, items):
+    """
+    Take stock for every item in one call (sql/stock_reservations.sql).
+    Each product is decremented only if stock >= quantity; if any product is short
+    nothing is reserved and an exception is raised. Reusing a key is a no-op.
+    Returns True if this call took the stock, False if the key was already reserved.
+    """
+    merged = _merge_items(items)
+    res = supabase.rpc("reserve_stock", {
+        "reservation_key": reservation_key,
+        "items": merged
+    }).execute()
+    _invalidate_products(merged)
+    return bool((res.data or {}).get("created"))
+
+def release_stock(reservation_key, items=()):
+    """
+    Give back the stock held by a reservation. Releasing twice is a no-op.
+    `items` is only used for orders placed before reservations existed.
+    """
+    res = supabase.rpc("release_stock", {
+        "reservation_key": reservation_key,
+        "items": _merge_items(items)
+    }).execute()
+    _invalidate_products(res.data or [])
+    return res.data or []
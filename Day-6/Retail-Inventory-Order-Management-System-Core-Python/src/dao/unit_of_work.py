@@ -0,0 +1,152 @@
+# src/dao/unit_of_work.py
+"""
+Request-scoped unit of work for the service layer.
+
+Reads go through an identity map, so a row is fetched at most once per unit
+(and many rows are fetched with one in_ query). Writes are only recorded and
+are flushed at commit() in as few requests as possible:
+
+  1. deferred DAO calls (e.g. stock releases), in the order they were added
+  2. new orders: all headers in one insert, all items in another
+     (atomic orders go through the create_order_with_items RPC one by one)
+  3. updates, grouped so rows receiving identical changes share one request
+  4. revenue rollup deltas, merged into one apply_revenue_rollups call; rollups
+     are derived data, so a failure here only warns (repair with
+     analytics_service.rebuild())
+
+    with UnitOfWork() as uow:
+        order = uow.get("orders", 42)
+        uow.update("orders", 42, {"status": "COMPLETED"})
+    # committed here; on an exception nothing is written and the
+    # compensations registered with on_rollback() run instead
+"""
+import warnings
+from src.dao import customer_dao, order_dao, product_dao, rollup_dao
+
+_LOADERS = {
+    "customers": customer_dao.get_customers_by_ids,
+    "products": product_dao.get_products_by_ids,
+    "orders": order_dao.get_orders_by_ids,
+}
+
+_UPDATERS = {
+    "products": product_dao.update_products,
+    "orders": order_dao.update_orders,
+}
+
+class UnitOfWork:
+    def __init__(self):
+        self._identity = {table: {} for table in _LOADERS}
+        self._deferred = []
+        self._new_orders = []
+        self._updates = {table: {} for table in _UPDATERS}
+        self._compensations = []
+        self._rollups = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    # -------------------- identity map --------------------
+    def get_many(self, table, keys):
+        """Return {key: row} for the keys that exist, loading unseen keys in one query."""
+        seen = self._identity[table]
+        missing = [k for k in dict.fromkeys(keys) if k not in seen]
+        if missing:
+            loaded = _LOADERS[table](missing)
+            for k in missing:
+                seen[k] = loaded.get(k)
+        return {k: seen[k] for k in keys if seen.get(k) is not None}
+
+    def get(self, table, key):
+        return self.get_many(table, [key]).get(key)
+
+    # -------------------- pending writes --------------------
+    def defer(self, fn, *args):
+        """Run a DAO call at commit time, before inserts and updates."""
+        self._deferred.append((fn, args))
+
+    def on_rollback(self, fn, *args):
+        """Compensation to run if the unit is rolled back or its commit fails."""
+        self._compensations.append((fn, args))
+
+    def add_order(self, order_data, items, atomic=False):
+        """
+        Queue a new order. The returned dict is filled in with the stored
+        order (order_id, items, ...) when the unit commits.
+        """
+        pending = dict(order_data)
+        self._new_orders.append((order_data, items, atomic, pending))
+        return pending
+
+    def pending_order(self, reservation_key):
+        """The order queued in this unit under reservation_key, if any."""
+        for order_data, _, _, pending in self._new_orders:
+            if order_data.get("reservation_key") == reservation_key:
+                return pending
+        return None
+
+    def update(self, table, key, changes):
+        self._updates[table].setdefault(key, {}).update(changes)
+        row = self._identity.get(table, {}).get(key)
+        if row is not None:
+            row.update(changes)
+
+    def add_rollups(self, deltas):
+        """Queue revenue rollup deltas (see analytics_service.order_deltas)."""
+        self._rollups.extend(deltas)
+
+    # -------------------- commit / rollback --------------------
+    def commit(self):
+        try:
+            for fn, args in self._deferred:
+                fn(*args)
+            self._flush_orders()
+            self._flush_updates()
+        except Exception:
+            self.rollback()
+            raise
+        rollups = self._rollups
+        self._reset()
+        if rollups:
+            try:
+                rollup_dao.apply_rollups(rollup_dao.merge_deltas(rollups))
+            except Exception as e:
+                warnings.warn(f"Revenue rollups not updated: {e}")
+
+    def rollback(self):
+        compensations = self._compensations
+        self._reset()
+        for fn, args in reversed(compensations):
+            fn(*args)
+
+    def _flush_orders(self):
+        batched = [(d, i, p) for d, i, atomic, p in self._new_orders if not atomic]
+        created = order_dao.create_orders([(d, i) for d, i, _ in batched])
+        for (_, _, pending), order in zip(batched, created):
+            pending.update(order)
+        for order_data, items, atomic, pending in self._new_orders:
+            if atomic:
+                pending.update(order_dao.create_order_atomic(order_data, items))
+
+    def _flush_updates(self):
+        for table, pending in self._updates.items():
+            groups = {}
+            for key, changes in pending.items():
+                signature = tuple(sorted(changes.items()))
+                groups.setdefault(signature, []).append(key)
+            for signature, keys in groups.items():
+                _UPDATERS[table](keys, dict(signature))
+
+    def _reset(self):
+        self._deferred = []
+        self._new_orders = []
+        self._updates = {table: {} for table in _UPDATERS}
+        self._compensations = []
+        self._rollups = []
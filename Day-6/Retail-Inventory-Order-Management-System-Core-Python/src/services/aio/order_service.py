@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+import warnings
+from src.dao.aio import order_dao, customer_dao, product_dao, rollup_dao, stock_dao
+from src.dao.errors import is_unique_violation
+from src.services import analytics_service
+from src.services.order_service import OrderError
+
+async def _apply_rollups(order, event):
+    # same revenue rollups as the sync service; they are derived data, so
+    # (as in UnitOfWork.commit) a failure only warns
+    try:
+        await rollup_dao.apply_rollups(rollup_dao.merge_deltas(analytics_service.order_deltas(order, event)))
+    except Exception as e:
+        warnings.warn(f"Revenue rollups not updated: {e}")
+
+async def validate_order(customer_id, items):
+    """
+    Load the customer and all products concurrently (the products in one
+    in_ query). Returns the items enriched with their current price.
+    """
+    customer, products = await asyncio.gather(
+        customer_dao.get_customer_by_id(customer_id),
+        product_dao.get_products_by_ids([i["prod_id"] for i in items]),
+    )
+    if not customer:
+        raise OrderError(f"Customer not found: {customer_id}")
+    enriched_items = []
+    for i in items:
+        prod = products.get(i["prod_id"])
+        if not prod:
+            raise OrderError(f"Product not found: {i['prod_id']}")
+        enriched_items.append({"prod_id": i["prod_id"], "quantity": i["quantity"], "price": float(prod["price"])})
+    return enriched_items
+
+async def create_order(customer_id, items, atomic=False, idempotency_key=None):
+    if idempotency_key:
+        existing = await order_dao.get_order_by_reservation_key(idempotency_key)
+        if existing:
+            return existing
+
+    enriched_items = await validate_order(customer_id, items)
+    total_amount = sum(i["quantity"] * i["price"] for i in enriched_items)
+
+    reservation_key = idempotency_key or uuid.uuid4().hex
+    try:
+        created = await stock_dao.reserve_stock(reservation_key, enriched_items)
+    except Exception as e:
+        raise OrderError(f"Could not reserve stock: {e}")
+    if not created:
+        existing = await order_dao.get_order_by_reservation_key(reservation_key)
+        if existing:
+            return existing
+
+    order_data = {"cust_id": customer_id, "total_amount": total_amount, "reservation_key": reservation_key}
+    try:
+        order = await order_dao.create_order(order_data, enriched_items, atomic=atomic)
+    except Exception as e:
+        existing = await order_dao.get_order_by_reservation_key(reservation_key)
+        if existing and is_unique_violation(e):
+            # a concurrent retry with the same key wrote its order first
+            return existing
+        if created and not existing:
+            await stock_dao.release_stock(reservation_key)
+        raise
+    await _apply_rollups({**order, "items": enriched_items}, "placed")
+    return order
+
+async def get_order(order_id):
+    return await order_dao.get_order_by_id(order_id)
+
+async def list_orders_by_customer(customer_id):
+    return await order_dao.list_orders_by_customer(customer_id)
+
+def iter_orders_by_customer(customer_id, page_size=100):
+    return order_dao.iter_orders_by_customer(customer_id, page_size)
+
+async def cancel_order(order_id):
+    order = await get_order(order_id)
+    if not order:
+        raise OrderError("Order not found")
+    if order["status"] != "PLACED":
+        raise OrderError("Only PLACED orders can be cancelled")
+    reservation_key = order.get("reservation_key") or f"order-{order_id}"
+    await stock_dao.release_stock(reservation_key, order["items"])
+    updated = await order_dao.update_order(order_id, {"status": "CANCELLED"})
+    await _apply_rollups(order, "cancelled")
+    return updated
+
+async def complete_order(order_id):
+    order = await get_order(order_id)
+    if not order:
+        raise OrderError("Order not found")
+    if order["status"] != "PLACED":
+        raise OrderError("Only PLACED orders can be completed")
+    updated = await order_dao.update_order(order_id, {"status": "COMPLETED"})
+    await _apply_rollups(order, "completed")
+    return updated
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from src.dao import order_dao, rollup_dao
+
+DIMENSIONS = ("day", "product", "customer")
+
+def _day(order):
+    stamp = order.get("order_date")
+    if stamp:
+        return str(stamp)[:10]
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def order_deltas(order, event):
+    """
+    Counter deltas for one order event ("placed", "cancelled" or "completed")
+    across the day, customer and product rollups.
+    """
+    items = order.get("items") or []
+    amount = float(order.get("total_amount") or sum(i["quantity"] * float(i["price"]) for i in items))
+    units = sum(i["quantity"] for i in items)
+
+    by_product = {}
+    for i in items:
+        p = by_product.setdefault(str(i["prod_id"]), {"units": 0, "revenue": 0.0})
+        p["units"] += i["quantity"]
+        p["revenue"] += i["quantity"] * float(i["price"])
+
+    if event == "placed":
+        sign, extra = 1, {}
+    elif event == "cancelled":
+        sign, extra = -1, {"cancelled_orders": 1, "cancelled_revenue": amount}
+    elif event == "completed":
+        return [
+            {"dimension": "day", "dim_key": _day(order), "completed_orders": 1, "completed_revenue": amount},
+            {"dimension": "customer", "dim_key": str(order["cust_id"]), "completed_orders": 1, "completed_revenue": amount},
+        ] + [
+            {"dimension": "product", "dim_key": pid, "completed_orders": 1, "completed_revenue": p["revenue"]}
+            for pid, p in by_product.items()
+        ]
+    else:
+        raise ValueError(f"Unknown order event: {event}")
+
+    deltas = [
+        {"dimension": "day", "dim_key": _day(order), "orders": sign, "units": sign * units,
+         "revenue": sign * amount, **extra},
+        {"dimension": "customer", "dim_key": str(order["cust_id"]), "orders": sign, "units": sign * units,
+         "revenue": sign * amount, **extra},
+    ]
+    for pid, p in by_product.items():
+        product_extra = {"cancelled_orders": 1, "cancelled_revenue": p["revenue"]} if extra else {}
+        deltas.append({"dimension": "product", "dim_key": pid, "orders": sign, "units": sign * p["units"],
+                       "revenue": sign * p["revenue"], **product_extra})
+    return deltas
+
+def get_day(day):
+    return rollup_dao.get_rollup("day", day)
+
+def get_product(prod_id):
+    return rollup_dao.get_rollup("product", prod_id)
+
+def get_customer(cust_id):
+    return rollup_dao.get_rollup("customer", cust_id)
+
+def list_days(start=None, end=None):
+    return rollup_dao.list_rollups("day", start, end)
+
+def top(dimension, metric="revenue", limit=10):
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"dimension must be one of {', '.join(DIMENSIONS)}")
+    return rollup_dao.top_rollups(dimension, metric, limit)
+
+def rebuild(batch_size=500):
+    """
+    Recompute every rollup from the raw orders, e.g. after enabling rollups on
+    an existing database. Returns the number of orders scanned.
+    """
+    rollup_dao.clear_rollups()
+    scanned = 0
+    pending = []
+    for order in order_dao.iter_orders(batch_size):
+        scanned += 1
+        pending += order_deltas(order, "placed")
+        if order.get("status") == "CANCELLED":
+            pending += order_deltas(order, "cancelled")
+        elif order.get("status") == "COMPLETED":
+            pending += order_deltas(order, "completed")
+        if scanned % batch_size == 0:
+            rollup_dao.apply_rollups(rollup_dao.merge_deltas(pending))
+            pending = []
+    rollup_dao.apply_rollups(rollup_dao.merge_deltas(pending))
+    return scanned
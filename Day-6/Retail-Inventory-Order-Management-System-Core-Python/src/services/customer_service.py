@@ -1,10 +1,119 @@
+from common.batching import chunked, run_batches, with_retries
 from src.dao import customer_dao
+from src.dao.errors import DuplicateKeyError
 
 class CustomerError(Exception):
     pass
 
 def add_customer(name, email, phone, city=None):
-    return customer_dao.create_customer(name, email, phone, city)
+    email = normalize_email(email)
+    try:
+        return customer_dao.create_customer(name, email, phone, city)
+    except DuplicateKeyError:
+        raise CustomerError(f"Email already exists: {email}")
+
+def add_customers(customers, on_conflict="error"):
+    """
+    Write a batch of customers in one request.
+    on_conflict: "error" (raise CustomerError on an existing email), "update" or "ignore".
+    """
+    customers = [{**c, "email": normalize_email(c.get("email"))} for c in customers]
+    try:
+        return customer_dao.create_customers(customers, on_conflict)
+    except DuplicateKeyError as e:
+        raise CustomerError(f"Email already exists: {e}")
+
+def _text(value):
+    # JSONL rows may carry numbers (e.g. a phone) where CSV has strings
+    return "" if value is None else str(value).strip()
+
+def normalize_email(email):
+    return _text(email).lower()
+
+def _normalize_import_row(row):
+    name = _text(row.get("name"))
+    email = normalize_email(row.get("email"))
+    if not name or not email:
+        raise CustomerError("name and email are required")
+    if "@" not in email:
+        raise CustomerError(f"Invalid email: {email}")
+    customer = {"name": name, "email": email, "phone": _text(row.get("phone")) or None}
+    if _text(row.get("city")):
+        customer["city"] = _text(row["city"])
+    return customer
+
+def _import_batch(batch, retries, retry_delay):
+    """
+    Dedupe a batch on email, drop emails that already exist (one in_ query)
+    and insert the rest in one request. Returns (inserted, duplicates) where
+    duplicates is a list of (email, reason).
+    """
+    seen = set()
+    fresh = []
+    duplicates = []
+    for c in batch:
+        if c["email"] in seen:
+            duplicates.append((c["email"], "repeated in file"))
+        else:
+            seen.add(c["email"])
+            fresh.append(c)
+
+    def write():
+        existing = customer_dao.get_existing_emails(seen)
+        survivors = [c for c in fresh if c["email"] not in existing]
+        # "ignore" covers emails inserted between the check and the write
+        # (another batch or another client), so the batch never aborts on them
+        return existing, survivors, customer_dao.create_customers(survivors, on_conflict="ignore")
+
+    existing, survivors, rows = with_retries(write, retries=retries, retry_delay=retry_delay)
+    written = {r["email"] for r in rows}
+    duplicates.extend((e, "already exists") for e in sorted(existing))
+    duplicates.extend((c["email"], "already exists") for c in survivors if c["email"] not in written)
+    return len(rows), duplicates
+
+def import_customers(rows, batch_size=500, workers=4, retries=3, retry_delay=1.0, on_batch=None):
+    """
+    Insert customers from an iterable of dicts (name, email, phone, city),
+    batch by batch using a pool of workers. Emails are trimmed and
+    lower-cased; duplicates within a batch or against existing customers
+    are skipped and reported through on_batch, never aborting the import.
+    `rows` is consumed lazily and at most 2 * workers batches are in flight.
+    """
+    summary = {"rows": 0, "invalid": 0, "inserted": 0, "duplicates": 0,
+               "batches": 0, "failed_batches": 0, "failed_rows": 0}
+
+    def valid_rows():
+        for row in rows:
+            summary["rows"] += 1
+            try:
+                yield _normalize_import_row(row)
+            except CustomerError as e:
+                summary["invalid"] += 1
+                if on_batch:
+                    on_batch({"row": summary["rows"], "error": str(e)})
+
+    def done(batch_no, batch, result, error):
+        report = {"batch": batch_no, "rows": len(batch)}
+        if error:
+            summary["failed_batches"] += 1
+            summary["failed_rows"] += len(batch)
+            report["error"] = str(error)
+        else:
+            inserted, duplicates = result
+            summary["inserted"] += inserted
+            summary["duplicates"] += len(duplicates)
+            report["inserted"] = inserted
+            report["duplicates"] = duplicates
+        if on_batch:
+            on_batch(report)
+
+    summary["batches"] = run_batches(
+        chunked(valid_rows(), batch_size),
+        lambda batch: _import_batch(batch, retries, retry_delay),
+        workers,
+        done,
+    )
+    return summary
 
 def list_customers():
     return customer_dao.list_customers()
@@ -1,35 +1,90 @@
-from src.dao import order_dao, customer_dao, product_dao
+import uuid
+from src.dao import order_dao, stock_dao
+from src.dao.errors import is_unique_violation
+from src.dao.unit_of_work import UnitOfWork
+from src.services import analytics_service
 
 class OrderError(Exception):
     pass
 
-def create_order(customer_id, items):
+def _release_unclaimed(reservation_key):
+    # compensation for a reservation this unit took: if an order holding the key
+    # was written by a concurrent retry, the stock is that order's and stays taken
+    if not order_dao.get_order_by_reservation_key(reservation_key):
+        stock_dao.release_stock(reservation_key)
+
+def create_order(customer_id, items, atomic=False, idempotency_key=None, uow=None):
+    """
+    Validate and place an order. Stock is taken with one atomic reservation
+    (stock >= quantity per product); retrying with the same idempotency_key
+    returns the order already placed instead of creating another one.
+    The order itself is written when the unit of work commits.
+    """
+    if uow is None:
+        try:
+            with UnitOfWork() as uow:
+                return create_order(customer_id, items, atomic, idempotency_key, uow)
+        except Exception as e:
+            # a concurrent retry with the same key wrote its order first
+            if idempotency_key and is_unique_violation(e):
+                existing = order_dao.get_order_by_reservation_key(idempotency_key)
+                if existing:
+                    return existing
+            raise
+
+    if idempotency_key:
+        existing = uow.pending_order(idempotency_key) or order_dao.get_order_by_reservation_key(idempotency_key)
+        if existing:
+            return existing
+
     # check customer
-    customer = customer_dao.get_customer_by_id(customer_id)
+    customer = uow.get("customers", customer_id)
     if not customer:
         raise OrderError(f"Customer not found: {customer_id}")
 
     total_amount = 0
     enriched_items = []
 
-    # check products and stock
+    # check products; stock is checked by the reservation, which also covers a
+    # retry whose stock was already taken by the first attempt
+    products = uow.get_many("products", [i["prod_id"] for i in items])
     for i in items:
-        prod = product_dao.get_product_by_id(i["prod_id"])
+        prod = products.get(i["prod_id"])
         if not prod:
             raise OrderError(f"Product not found: {i['prod_id']}")
-        if i["quantity"] > prod.get("stock", 0):
-            raise OrderError(f"Not enough stock for product: {i['prod_id']}")
         total_amount += i["quantity"] * float(prod["price"])
         enriched_items.append({"prod_id": i["prod_id"], "quantity": i["quantity"], "price": float(prod["price"])})
 
-    # deduct stock
-    for i in enriched_items:
-        prod = product_dao.get_product_by_id(i["prod_id"])
-        new_stock = prod["stock"] - i["quantity"]
-        product_dao.create_product(prod["name"], prod["sku"], float(prod["price"]), new_stock, prod.get("category"))
+    # reserve stock for all items at once
+    reservation_key = idempotency_key or uuid.uuid4().hex
+    try:
+        created = stock_dao.reserve_stock(reservation_key, enriched_items)
+    except Exception as e:
+        raise OrderError(f"Could not reserve stock: {e}")
+    if created:
+        uow.on_rollback(_release_unclaimed, reservation_key)
+    else:
+        # the key was reserved by an earlier attempt: return its order, or place
+        # the order on that reservation if the attempt failed before writing it
+        existing = order_dao.get_order_by_reservation_key(reservation_key)
+        if existing:
+            return existing
 
-    order_data = {"cust_id": customer_id, "total_amount": total_amount}
-    return order_dao.create_order(order_data, enriched_items)
+    order_data = {"cust_id": customer_id, "total_amount": total_amount, "reservation_key": reservation_key}
+    order = uow.add_order(order_data, enriched_items, atomic=atomic)
+    uow.add_rollups(analytics_service.order_deltas({**order_data, "items": enriched_items}, "placed"))
+    return order
+
+def create_orders(orders, atomic=False):
+    """
+    Place many orders ({"cust_id", "items"}) in one unit of work: customers and
+    products are read once, and all headers and items are written in two requests.
+    If any order fails, the stock reserved for the others is released.
+    """
+    with UnitOfWork() as uow:
+        uow.get_many("customers", [o["cust_id"] for o in orders])
+        uow.get_many("products", [i["prod_id"] for o in orders for i in o["items"]])
+        return [create_order(o["cust_id"], o["items"], atomic, o.get("idempotency_key"), uow) for o in orders]
 
 def get_order(order_id):
     return order_dao.get_order_by_id(order_id)
@@ -37,20 +92,47 @@ def get_order(order_id):
 def list_orders_by_customer(customer_id):
     return order_dao.list_orders_by_customer(customer_id)
 
-def cancel_order(order_id):
-    order = get_order(order_id)
+def list_orders_by_customer_page(customer_id, page_size=100, after=None):
+    return order_dao.list_orders_by_customer_page(customer_id, page_size, after)
+
+def iter_orders_by_customer(customer_id, page_size=100):
+    return order_dao.iter_orders_by_customer(customer_id, page_size)
+
+def cancel_order(order_id, uow=None):
+    if uow is None:
+        with UnitOfWork() as uow:
+            return cancel_order(order_id, uow)
+    order = uow.get("orders", order_id)
     if not order:
         raise OrderError("Order not found")
     if order["status"] != "PLACED":
         raise OrderError("Only PLACED orders can be cancelled")
     # restore stock
-    for item in order["items"]:
-        prod = product_dao.get_product_by_id(item["prod_id"])
-        product_dao.create_product(prod["name"], prod["sku"], float(prod["price"]), prod["stock"] + item["quantity"], prod.get("category"))
-    return order_dao.update_order(order_id, {"status": "CANCELLED"})
+    reservation_key = order.get("reservation_key") or f"order-{order_id}"
+    uow.defer(stock_dao.release_stock, reservation_key, order["items"])
+    uow.add_rollups(analytics_service.order_deltas(order, "cancelled"))
+    uow.update("orders", order_id, {"status": "CANCELLED"})
+    return order
+
+def cancel_orders(order_ids):
+    with UnitOfWork() as uow:
+        uow.get_many("orders", order_ids)
+        return [cancel_order(oid, uow) for oid in order_ids]
 
-def complete_order(order_id):
-    order = get_order(order_id)
+def complete_order(order_id, uow=None):
+    if uow is None:
+        with UnitOfWork() as uow:
+            return complete_order(order_id, uow)
+    order = uow.get("orders", order_id)
     if not order:
         raise OrderError("Order not found")
-    return order_dao.update_order(order_id, {"status": "COMPLETED"})
+    if order["status"] != "PLACED":
+        raise OrderError("Only PLACED orders can be completed")
+    uow.add_rollups(analytics_service.order_deltas(order, "completed"))
+    uow.update("orders", order_id, {"status": "COMPLETED"})
+    return order
+
+def complete_orders(order_ids):
+    with UnitOfWork() as uow:
+        uow.get_many("orders", order_ids)
+        return [complete_order(oid, uow) for oid in order_ids]
@@ -1,5 +1,7 @@
-from typing import List, Dict
+from typing import Callable, List, Dict, Iterable, Iterator, Optional
+from common.batching import run_batches, with_retries
 import src.dao.product_dao as product_dao
+from src.dao.errors import DuplicateKeyError
  
 class ProductError(Exception):
     pass
@@ -11,10 +13,23 @@ def add_product(name: str, sku: str, price: float, stock: int = 0, category: str
     """
     if price <= 0:
         raise ProductError("Price must be greater than 0")
-    existing = product_dao.get_product_by_sku(sku)
-    if existing:
+    try:
+        return product_dao.create_product(name, sku, price, stock, category)
+    except DuplicateKeyError:
         raise ProductError(f"SKU already exists: {sku}")
-    return product_dao.create_product(name, sku, price, stock, category)
+ 
+def add_products(products: List[Dict], on_conflict: str = "error") -> List[Dict]:
+    """
+    Validate and write a batch of products in one request.
+    on_conflict: "error" (raise ProductError on an existing sku), "update" or "ignore".
+    """
+    for p in products:
+        if p.get("price") is None or p["price"] <= 0:
+            raise ProductError(f"Price must be greater than 0 (sku {p.get('sku')})")
+    try:
+        return product_dao.create_products(products, on_conflict)
+    except DuplicateKeyError as e:
+        raise ProductError(f"SKU already exists: {e}")
  
 def restock_product(prod_id: int, delta: int) -> Dict:
     if delta <= 0:
@@ -26,5 +41,88 @@ def restock_product(prod_id: int, delta: int) -> Dict:
     return product_dao.update_product(prod_id, {"stock": new_stock})
  
 def get_low_stock(threshold: int = 5) -> List[Dict]:
-    allp = product_dao.list_products(limit=1000)
-    return [p for p in allp if (p.get("stock") or 0) <= threshold]
\ No newline at end of file
+    return list(iter_low_stock(threshold))
+ 
+def iter_low_stock(threshold: int = 5, page_size: int = 1000) -> Iterator[Dict]:
+    """
+    Stream every product with stock <= threshold, page by page.
+    """
+    return product_dao.iter_low_stock(threshold, page_size)
+ 
+def _text(value: object) -> str:
+    # JSONL rows may carry numbers (e.g. "sku": 1001) where CSV has strings
+    return "" if value is None else str(value).strip()
+
+def _normalize_import_row(row: Dict) -> Dict:
+    sku = _text(row.get("sku"))
+    name = _text(row.get("name"))
+    if not sku or not name:
+        raise ProductError("name and sku are required")
+    price = float(row.get("price") or 0)
+    if price <= 0:
+        raise ProductError(f"Price must be greater than 0 (sku {sku})")
+    product = {"name": name, "sku": sku, "price": price, "stock": int(row.get("stock") or 0)}
+    if _text(row.get("category")):
+        product["category"] = _text(row["category"])
+    return product
+ 
+def _batches(rows: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    batch: Dict[str, Dict] = {}
+    for row in rows:
+        # one upsert cannot touch the same sku twice, so the last row wins
+        batch[row["sku"]] = row
+        if len(batch) >= batch_size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+ 
+def _upsert_batch(batch: List[Dict], retries: int, retry_delay: float) -> int:
+    return len(with_retries(product_dao.upsert_products, batch, retries=retries, retry_delay=retry_delay))
+ 
+def import_products(rows: Iterable[Dict], batch_size: int = 500, workers: int = 4, retries: int = 3,
+                    retry_delay: float = 1.0, on_batch: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Upsert products on sku in batches using a pool of workers.
+    `rows` is consumed lazily and at most 2 * workers batches are in flight.
+    Invalid rows are skipped and counted; a batch that still fails after
+    `retries` attempts is reported through on_batch and the import continues.
+    """
+    summary = {"rows": 0, "invalid": 0, "written": 0, "batches": 0, "failed_batches": 0, "failed_rows": 0}
+ 
+    def valid_rows():
+        for row in rows:
+            summary["rows"] += 1
+            try:
+                yield _normalize_import_row(row)
+            except (ProductError, ValueError, TypeError) as e:
+                summary["invalid"] += 1
+                if on_batch:
+                    on_batch({"row": summary["rows"], "error": str(e)})
+ 
+    def done(batch_no, batch, written, error):
+        report = {"batch": batch_no, "rows": len(batch)}
+        if error:
+            summary["failed_batches"] += 1
+            summary["failed_rows"] += len(batch)
+            report["error"] = str(error)
+        else:
+            summary["written"] += written
+        if on_batch:
+            on_batch(report)
+ 
+    summary["batches"] = run_batches(
+        _batches(valid_rows(), batch_size),
+        lambda batch: _upsert_batch(batch, retries, retry_delay),
+        workers,
+        done,
+    )
+    return summary
+ 
+def iter_catalog(
+    page_size: int = 1000,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> Iterator[Dict]:
+    return product_dao.iter_products(page_size, after=after, limit=limit, fields=fields)
@@ -0,0 +1,37 @@
+# tests/conftest.py
+"""
+Tests run offline on the in-memory backend (src/dao/backends/memory.py):
+
+    python -m pytest tests
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# must be set before src.dao.supabase_client is imported
+os.environ.setdefault("RETAIL_BACKEND", "memory")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.dao.backends.memory import MemoryBackend
+from src.dao.supabase_client import set_backend
+
+@pytest.fixture
+def backend():
+    """A fresh, empty store behind every DAO (the DAO cache is cleared too)."""
+    store = MemoryBackend()
+    set_backend(store)
+    return store
+
+@pytest.fixture
+def product(backend):
+    return backend.table("products").insert(
+        {"name": "Pen", "sku": "PEN-1", "price": 2.5, "stock": 10}
+    ).execute().data[0]
+
+@pytest.fixture
+def customer(backend):
+    return backend.table("customers").insert(
+        {"name": "Ada", "email": "ada@example.com", "phone": "555"}
+    ).execute().data[0]
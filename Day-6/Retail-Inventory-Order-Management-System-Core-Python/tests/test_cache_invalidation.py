@@ -0,0 +1,87 @@
+# tests/test_cache_invalidation.py
+"""
+Writes through the unit of work and the stock RPCs must evict the cached
+product rows, so the next read sees the new stock.
+"""
+from src.dao import cache, product_dao, stock_dao
+from src.dao.unit_of_work import UnitOfWork
+from src.services import order_service
+
+def _write_behind_cache(backend, prod_id, stock):
+    # change the row without going through the DAO layer
+    backend.table("products").update({"stock": stock}).eq("prod_id", prod_id).execute()
+
+def test_reads_are_cached(backend, product):
+    pid = product["prod_id"]
+    assert product_dao.get_product_by_id(pid)["stock"] == 10
+    _write_behind_cache(backend, pid, 3)
+    # served from the cache: proves the eviction tests below test something
+    assert product_dao.get_product_by_id(pid)["stock"] == 10
+
+def test_unit_of_work_update_evicts(backend, product):
+    pid = product["prod_id"]
+    product_dao.get_product_by_id(pid)
+    product_dao.get_product_by_sku("PEN-1")
+    with UnitOfWork() as uow:
+        uow.update("products", pid, {"stock": 4})
+    assert product_dao.get_product_by_id(pid)["stock"] == 4
+    assert product_dao.get_product_by_sku("PEN-1")["stock"] == 4
+    assert product_dao.get_products_by_ids([pid])[pid]["stock"] == 4
+
+def test_reserve_stock_evicts(backend, product):
+    pid = product["prod_id"]
+    product_dao.get_product_by_id(pid)
+    assert stock_dao.reserve_stock("order-1", [{"prod_id": pid, "quantity": 3}])
+    assert product_dao.get_product_by_id(pid)["stock"] == 7
+    assert product_dao.get_products_by_ids([pid])[pid]["stock"] == 7
+
+def test_release_stock_evicts(backend, product):
+    pid = product["prod_id"]
+    stock_dao.reserve_stock("order-1", [{"prod_id": pid, "quantity": 3}])
+    assert product_dao.get_product_by_sku("PEN-1")["stock"] == 7
+    stock_dao.release_stock("order-1")
+    assert product_dao.get_product_by_sku("PEN-1")["stock"] == 10
+
+def test_create_and_cancel_order_evict(backend, product, customer):
+    pid = product["prod_id"]
+    product_dao.get_product_by_id(pid)
+    order = order_service.create_order(customer["cust_id"], [{"prod_id": pid, "quantity": 2}])
+    assert product_dao.get_product_by_id(pid)["stock"] == 8
+    order_service.cancel_order(order["order_id"])
+    assert product_dao.get_product_by_id(pid)["stock"] == 10
+
+def test_rolled_back_order_evicts(backend, product, customer):
+    pid = product["prod_id"]
+    try:
+        with UnitOfWork() as uow:
+            order_service.create_order(customer["cust_id"], [{"prod_id": pid, "quantity": 2}], uow=uow)
+            assert product_dao.get_product_by_id(pid)["stock"] == 8
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    # the compensation released the reservation; the cached 8 must be gone
+    assert product_dao.get_product_by_id(pid)["stock"] == 10
+
+def test_rolled_back_update_leaves_cache_matching_db(backend, product):
+    pid = product["prod_id"]
+    product_dao.get_products_by_ids([pid])
+    try:
+        with UnitOfWork() as uow:
+            uow.get("products", pid)
+            uow.update("products", pid, {"stock": 0})
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    stored = backend.table("products").select("*").eq("prod_id", pid).execute().data[0]
+    assert stored["stock"] == 10
+    assert product_dao.get_product_by_id(pid)["stock"] == stored["stock"]
+    assert product_dao.get_products_by_ids([pid])[pid]["stock"] == stored["stock"]
+
+def test_upsert_evicts_every_alias(backend, product):
+    pid = product["prod_id"]
+    product_dao.get_product_by_id(pid)
+    # only the prod_id entry survives, as after an LRU eviction of the sku key
+    cache.invalidate("product", sku="PEN-1")
+    cache.put("product", {**product, "sku": None})
+    product_dao.upsert_products([{"name": "Pen", "sku": "PEN-1", "price": 2.5, "stock": 1}])
+    assert product_dao.get_product_by_id(pid)["stock"] == 1
@@ -0,0 +1,26 @@
+# tests/test_order_service.py
+"""
+Order status transitions and the rollups they apply.
+"""
+import pytest
+
+from src.dao import rollup_dao
+from src.services import order_service
+
+def _customer_rollup(customer):
+    return rollup_dao.get_rollup("customer", customer["cust_id"]) or {}
+
+def test_complete_order_counts_completion(backend, product, customer):
+    order = order_service.create_order(customer["cust_id"], [{"prod_id": product["prod_id"], "quantity": 2}])
+    order_service.complete_order(order["order_id"])
+    assert order_service.get_order(order["order_id"])["status"] == "COMPLETED"
+    assert _customer_rollup(customer).get("completed_orders") == 1
+
+@pytest.mark.parametrize("first", ["cancel_order", "complete_order"])
+def test_only_placed_orders_can_be_completed(backend, product, customer, first):
+    order = order_service.create_order(customer["cust_id"], [{"prod_id": product["prod_id"], "quantity": 2}])
+    getattr(order_service, first)(order["order_id"])
+    before = _customer_rollup(customer)
+    with pytest.raises(order_service.OrderError):
+        order_service.complete_order(order["order_id"])
+    assert _customer_rollup(customer) == before
@@ -0,0 +1,82 @@
+"""
+Benchmark for the transform feature step.
+
+Builds a synthetic hourly frame (several cities, some missing readings),
+derives AQI_Category / Severity_Score / Risk_Level with the original
+row-wise functions (categorize_aqi, compute_severity, classify_risk via
+.apply) and with the vectorized transform.add_features, checks that both
+give identical values, and prints the timings.
+
+    python bench/features_bench.py --rows 200000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import transform
+
+def make_frame(rows: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "time": pd.date_range("2025-01-01", periods=rows, freq="h"),
+        "city": rng.choice(["Delhi", "Mumbai", "Kolkata", "Bengaluru", "Chennai"], rows),
+    })
+    for p in transform.POLLUTANTS:
+        values = rng.gamma(2.0, 40.0, rows).round(1)
+        # a few missing readings, plus values exactly on the bin edges
+        values[rng.random(rows) < 0.01] = np.nan
+        values[rng.random(rows) < 0.01] = rng.choice([50, 100, 200, 300])
+        df[p] = values
+    return df
+
+def row_wise(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["hour"] = df["time"].dt.hour
+    df["AQI_Category"] = df["pm2_5"].apply(transform.categorize_aqi)
+    df["Severity_Score"] = df.apply(transform.compute_severity, axis=1)
+    df["Risk_Level"] = df["Severity_Score"].apply(transform.classify_risk)
+    return df
+
+def vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    return transform.add_features(df.copy())
+
+def _timed(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - started)
+    return out, best
+
+def run(rows: int = 200_000, repeat: int = 3) -> None:
+    df = make_frame(rows)
+    old, t_old = _timed(row_wise, df, 1)
+    new, t_new = _timed(vectorized, df, repeat)
+
+    for col in ("hour", "AQI_Category", "Risk_Level"):
+        if not (old[col].astype(str) == new[col].astype(str)).all():
+            raise SystemExit(f"{col} differs between row-wise and vectorized")
+    a, b = old["Severity_Score"].to_numpy(float), new["Severity_Score"].to_numpy(float)
+    if not np.array_equal(a, b, equal_nan=True):
+        raise SystemExit("Severity_Score differs between row-wise and vectorized")
+
+    print(f"rows:        {rows}")
+    print(f"row-wise:    {t_old:.3f}s")
+    print(f"vectorized:  {t_new:.4f}s (best of {repeat})")
+    print(f"speedup:     {t_old / t_new:.0f}x")
+    print("outputs:     identical")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
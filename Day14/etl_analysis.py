@@ -2,8 +2,8 @@
 from dotenv import load_dotenv
 import os
 import pandas as pd
-from supabase import create_client
 from pathlib import Path
+from common.supabase_factory import lazy_client
 import matplotlib.pyplot as plt
  
 load_dotenv()
@@ -19,7 +19,7 @@ TABLE_NAME = "weather_data"
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise SystemExit("Please set SUPABASE_URL and SUPABASE_KEY in your .env")
  
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client(SUPABASE_URL, SUPABASE_KEY)
  
  
 def _extract_data_from_response(res):
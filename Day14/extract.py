@@ -5,19 +5,34 @@ Extract step for AtmosTrack Air Quality ETL using Open-Meteo API.
 
 - Fetches hourly pollutants including PM10, PM2.5, CO, NO2, O3, SO2, UV index.
 - Implements retry with exponential backoff (default 3 attempts).
-- Saves raw JSON responses to data/raw/<city>_raw_<timestamp>.json.
+- Fetches cities concurrently (EXTRACT_WORKERS threads) over one keep-alive
+  session, paced by a token bucket (EXTRACT_RATE_PER_SEC); a city waiting
+  on its backoff does not hold up the others.
+- Incremental mode (EXTRACT_INCREMENTAL=1) remembers the last hour stored per
+  city and only asks for the hours after it. The ETag / Last-Modified of the
+  last response per city is kept on disk and sent back as a conditional
+  request, and a run that brings nothing new writes no raw file. Full runs
+  always download and save.
+- Saves raw responses to data/raw/<city>_raw_<timestamp>.<ext> in RAW_FORMAT
+  (gzip NDJSON by default; see raw_store.py for zstd, Parquet and Arrow).
 - Returns a list of dicts containing city and saved file paths.
 """
 
 from __future__ import annotations
+import hashlib
+import heapq
 import json
 import os
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from raw_store import EXTENSIONS, write_raw
 
 load_dotenv()
 
@@ -31,6 +46,24 @@ CITY_COORDS = os.getenv("CITY_COORDS", "").split(";")
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
 TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "10"))
 SLEEP_BETWEEN_CALLS = float(os.getenv("SLEEP_BETWEEN_CALLS", "0.5"))
+RAW_FORMAT = os.getenv("RAW_FORMAT", "ndjson.gz")
+if RAW_FORMAT not in EXTENSIONS:
+    raise ValueError(f"Unknown RAW_FORMAT: {RAW_FORMAT} (expected one of {', '.join(EXTENSIONS)})")
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "8"))
+EXTRACT_RATE_PER_SEC = float(os.getenv("EXTRACT_RATE_PER_SEC", "10"))
+EXTRACT_BURST = int(os.getenv("EXTRACT_BURST", str(max(1, int(EXTRACT_RATE_PER_SEC)))))
+
+EXTRACT_INCREMENTAL = os.getenv("EXTRACT_INCREMENTAL", "0") == "1"
+# first incremental run per city starts this many days back (0 = today 00:00 UTC)
+EXTRACT_BACKFILL_DAYS = int(os.getenv("EXTRACT_BACKFILL_DAYS", "0"))
+STATE_PATH = Path(os.getenv("EXTRACT_STATE_PATH", RAW_DIR.parent / "extract_state.json"))
+CACHE_DIR = Path(os.getenv("EXTRACT_CACHE_DIR", RAW_DIR.parent / "cache"))
+# within this many seconds of the last fetch, hours already fetched are not asked for again
+CACHE_TTL_SECONDS = int(os.getenv("EXTRACT_CACHE_TTL", "900"))
+# cache entries untouched for this long (cities no longer extracted) are deleted
+CACHE_MAX_AGE_SECONDS = int(os.getenv("EXTRACT_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+HOURLY_FIELDS = "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,ozone,sulphur_dioxide,uv_index"
 
 # --- Helper functions ---
 def _now_ts() -> str:
@@ -38,45 +71,221 @@ def _now_ts() -> str:
     return datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
 def _save_raw(payload: object, city: str) -> str:
-    """Save JSON payload to RAW_DIR and return absolute path."""
-    ts = _now_ts()
-    filename = f"{city.replace(' ', '_').lower()}_raw_{ts}.json"
-    path = RAW_DIR / filename
+    """Atomically save payload to RAW_DIR in RAW_FORMAT and return absolute path."""
+    return write_raw(payload, city, RAW_DIR, _now_ts(), RAW_FORMAT)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: up to `capacity` requests at once, refilled at
+    `rate` tokens per second. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+def make_session(pool_size: int = EXTRACT_WORKERS) -> requests.Session:
+    """One keep-alive session whose connection pool fits all workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _write_json_atomic(path: Path, data: object) -> None:
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+# --- Incremental state: last hour stored per city ---
+_state_lock = threading.Lock()
+_state: Optional[Dict[str, Dict[str, str]]] = None
+
+def _load_state() -> Dict[str, Dict[str, str]]:
+    global _state
+    if _state is None:
+        try:
+            with open(STATE_PATH, encoding="utf-8") as f:
+                _state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _state = {}
+    return _state
+
+def last_hour(city: str) -> Optional[str]:
+    with _state_lock:
+        return _load_state().get(city, {}).get("last_hour")
+
+def _set_last_hour(city: str, hour: str) -> None:
+    with _state_lock:
+        state = _load_state()
+        state[city] = {"last_hour": hour}
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(STATE_PATH, state)
+
+def _incremental_window(city: str) -> Optional[Tuple[str, str]]:
+    """(start_hour, end_hour) still missing for city, up to the current UTC hour; None if up to date."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    last = last_hour(city)
+    if last:
+        start = datetime.fromisoformat(last) + timedelta(hours=1)
+    else:
+        start = now.replace(hour=0) - timedelta(days=EXTRACT_BACKFILL_DAYS)
+    if start > now:
+        return None
+    return start.strftime("%Y-%m-%dT%H:%M"), now.strftime("%Y-%m-%dT%H:%M")
+
+def _only_new_hours(payload: Dict, after: Optional[str]) -> Tuple[Dict, Optional[str]]:
+    """Drop hourly rows at or before `after`; returns the trimmed payload and its last hour."""
+    hourly = payload.get("hourly") or {}
+    times = hourly.get("time") or []
+    keep = [i for i, t in enumerate(times) if after is None or t > after]
+    if len(keep) != len(times):
+        hourly = {k: [v[i] for i in keep] if isinstance(v, list) and len(v) == len(times) else v
+                  for k, v in hourly.items()}
+        payload = {**payload, "hourly": hourly}
+    newest = hourly["time"][-1] if keep else None
+    return payload, newest
+
+def _parse(resp: requests.Response) -> object:
+    """Raise for HTTP errors, then return the JSON body (or the text if it is not JSON)."""
+    resp.raise_for_status()
+    try:
+        return resp.json()
+    except ValueError:
+        return {"raw_text": resp.text}
+
+# --- On-disk validator cache for conditional requests ---
+def _cache_path(lat: float, lon: float) -> Path:
+    """One entry per city request: coordinates and fields, not the hour window."""
+    key = json.dumps([API_BASE, str(lat), str(lon), HOURLY_FIELDS])
+    return CACHE_DIR / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+def _load_cache(lat: float, lon: float) -> Optional[Dict]:
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
-    except Exception:
-        path = RAW_DIR / f"{city.replace(' ', '_').lower()}_raw_{ts}.txt"
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(repr(payload))
-    return str(path.resolve())
-
-def _fetch_city(city: str, lat: float, lon: float, max_retries: int = MAX_RETRIES, timeout: int = TIMEOUT_SECONDS) -> Dict[str, Optional[str]]:
+        with open(_cache_path(lat, lon), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _store_cache(lat: float, lon: float, entry: Dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _write_json_atomic(_cache_path(lat, lon), entry)
+
+def prune_cache(max_age: int = CACHE_MAX_AGE_SECONDS) -> int:
+    """Delete cache entries (and leftover temp files) older than max_age seconds; returns the count."""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in CACHE_DIR.glob("*.json*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def _cached_get(city: str, lat: float, lon: float, params: Dict, timeout: int,
+                session: Optional[requests.Session]) -> Tuple[Optional[object], Optional[Dict]]:
     """
-    Fetch air quality data for a city with retry logic.
-    Returns dict: city, success, raw_path or error.
+    Incremental GET of params["start_hour"]..params["end_hour"] using the
+    city's cache entry (ETag, Last-Modified, fetched_at, last_hour). Returns
+    the payload and the entry to store, or (None, None) when there is nothing
+    new: the window was already fetched within CACHE_TTL_SECONDS, or the
+    server answered 304. The caller stores the entry with _store_cache() once
+    the payload is saved, so a failed save is fetched again next run.
     """
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "hourly": "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,ozone,sulphur_dioxide,uv_index"
+    entry = _load_cache(lat, lon)
+    end = params["end_hour"]
+    if (entry and entry.get("last_hour") and entry["last_hour"] >= end
+            and time.time() - entry["fetched_at"] < CACHE_TTL_SECONDS):
+        print(f"💤 [{city}] hours up to {end} fetched {int(time.time() - entry['fetched_at'])}s ago, skipping request")
+        return None, None
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    resp = (session or requests).get(API_BASE, params=params, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and entry:
+        entry["fetched_at"] = time.time()
+        entry["last_hour"] = end
+        _store_cache(lat, lon, entry)
+        print(f"💤 [{city}] not modified since last fetch")
+        return None, None
+    return _parse(resp), {
+        "fetched_at": time.time(),
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "last_hour": end,
     }
+
+def _request_city(city: str, lat: float, lon: float, timeout: int = TIMEOUT_SECONDS,
+                  session: Optional[requests.Session] = None,
+                  incremental: Optional[bool] = None) -> Optional[str]:
+    """
+    One fetch attempt: download, save and return the raw file path; raises on failure.
+    Returns None when there is nothing new to save (incremental mode only).
+    """
+    if incremental is None:
+        incremental = EXTRACT_INCREMENTAL
+    params = {"latitude": lat, "longitude": lon, "hourly": HOURLY_FIELDS}
+    if not incremental:
+        resp = (session or requests).get(API_BASE, params=params, timeout=timeout)
+        return _save_raw(_parse(resp), city)
+
+    window = _incremental_window(city)
+    if window is None:
+        return None
+    params["start_hour"], params["end_hour"] = window
+    after = last_hour(city)
+    payload, entry = _cached_get(city, lat, lon, params, timeout, session)
+    if payload is None:
+        return None
+    payload, newest = _only_new_hours(payload, after)
+    saved = _save_raw(payload, city) if newest is not None else None
+    # only once the raw file is written, so a failed save is retried in full
+    _store_cache(lat, lon, entry)
+    if newest is not None:
+        _set_last_hour(city, newest)
+    return saved
+
+def _report(city: str, saved: Optional[str]) -> Dict[str, Optional[str]]:
+    if saved:
+        print(f"✅ [{city}] fetched and saved to: {saved}")
+    else:
+        print(f"💤 [{city}] no new data")
+    return {"city": city, "success": "true", "raw_path": saved}
+
+def _fetch_city(city: str, lat: float, lon: float, max_retries: int = MAX_RETRIES, timeout: int = TIMEOUT_SECONDS,
+                session: Optional[requests.Session] = None) -> Dict[str, Optional[str]]:
+    """
+    Fetch air quality data for a city with retry logic.
+    Returns dict: city, success, raw_path (None if nothing new) or error.
+    """
     attempt = 0
     last_error: Optional[str] = None
 
     while attempt < max_retries:
         attempt += 1
         try:
-            resp = requests.get(API_BASE, params=params, timeout=timeout)
-            resp.raise_for_status()
-            try:
-                payload = resp.json()
-            except ValueError:
-                payload = {"raw_text": resp.text}
-
-            saved = _save_raw(payload, city)
-            print(f"✅ [{city}] fetched and saved to: {saved}")
-            return {"city": city, "success": "true", "raw_path": saved}
+            saved = _request_city(city, lat, lon, timeout, session)
+            return _report(city, saved)
 
         except requests.RequestException as e:
             last_error = str(e)
@@ -92,27 +301,91 @@ def _fetch_city(city: str, lat: float, lon: float, max_retries: int = MAX_RETRIE
     print(f"❌ [{city}] failed after {max_retries} attempts. Last error: {last_error}")
     return {"city": city, "success": "false", "error": last_error}
 
-def fetch_all_cities(city_coords: Optional[List[str]] = None) -> List[Dict[str, Optional[str]]]:
-    """
-    Fetch AQ data for all cities (lat,lon pairs in CITY_COORDS)
-    Returns list of dicts for each city.
-    """
-    if city_coords is None:
-        city_coords = CITY_COORDS
-
-    results: List[Dict[str, Optional[str]]] = []
-
+def parse_city_coords(city_coords: List[str]) -> List[Tuple[str, float, float]]:
+    """Parse "City:lat,lon" entries, skipping blank and invalid ones."""
+    cities = []
     for c in city_coords:
         if not c.strip():
             continue
         try:
             city, coords = c.split(":")
             lat_str, lon_str = coords.split(",")
-            lat, lon = float(lat_str), float(lon_str)
+            cities.append((city, float(lat_str), float(lon_str)))
         except ValueError:
             print(f"❌ Skipping invalid entry: {c}")
-            continue
+    return cities
 
+def fetch_cities_concurrently(cities: List[Tuple[str, float, float]], workers: int = EXTRACT_WORKERS,
+                              rate: float = EXTRACT_RATE_PER_SEC, burst: int = EXTRACT_BURST,
+                              max_retries: int = MAX_RETRIES, timeout: int = TIMEOUT_SECONDS) -> List[Dict[str, Optional[str]]]:
+    """
+    Fetch many cities on a thread pool sharing one session and one token bucket.
+    Each task is a single attempt; a failed city is put back on a schedule
+    with its own exponential backoff instead of sleeping in a worker, so the
+    other cities keep flowing. Results come back in input order.
+    """
+    bucket = TokenBucket(rate, burst)
+    results: List[Optional[Dict[str, Optional[str]]]] = [None] * len(cities)
+    # (ready_at, index, attempt) waiting to be (re)submitted
+    schedule = [(0.0, i, 1) for i in range(len(cities))]
+    heapq.heapify(schedule)
+    in_flight = {}
+
+    def attempt_city(i: int) -> Optional[str]:
+        city, lat, lon = cities[i]
+        bucket.acquire()
+        return _request_city(city, lat, lon, timeout, session)
+
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        while schedule or in_flight:
+            now = time.monotonic()
+            while schedule and schedule[0][0] <= now and len(in_flight) < 2 * workers:
+                _, i, attempt = heapq.heappop(schedule)
+                in_flight[pool.submit(attempt_city, i)] = (i, attempt)
+            if schedule and len(in_flight) < 2 * workers:
+                # wake up when the next retry is due
+                timeout_s = max(0.0, schedule[0][0] - now)
+            else:
+                # nothing can be submitted until a task finishes
+                timeout_s = None
+            if not in_flight:
+                time.sleep(timeout_s or 0)
+                continue
+            done, _ = wait(in_flight, timeout=timeout_s, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, attempt = in_flight.pop(fut)
+                city = cities[i][0]
+                try:
+                    results[i] = _report(city, fut.result())
+                except Exception as e:
+                    print(f"⚠️ [{city}] attempt {attempt}/{max_retries} failed: {e}")
+                    if attempt >= max_retries:
+                        print(f"❌ [{city}] failed after {max_retries} attempts. Last error: {e}")
+                        results[i] = {"city": city, "success": "false", "error": str(e)}
+                    else:
+                        backoff = 2 ** (attempt - 1)
+                        print(f"⏳ [{city}] retrying in {backoff}s ...")
+                        heapq.heappush(schedule, (time.monotonic() + backoff, i, attempt + 1))
+    return results
+
+def fetch_all_cities(city_coords: Optional[List[str]] = None, workers: int = EXTRACT_WORKERS) -> List[Dict[str, Optional[str]]]:
+    """
+    Fetch AQ data for all cities (lat,lon pairs in CITY_COORDS)
+    Returns list of dicts for each city.
+    workers > 1 fetches concurrently; workers == 1 keeps the original
+    one-city-at-a-time loop with SLEEP_BETWEEN_CALLS between calls.
+    """
+    if city_coords is None:
+        city_coords = CITY_COORDS
+
+    cities = parse_city_coords(city_coords)
+    if EXTRACT_INCREMENTAL and CACHE_DIR.exists():
+        prune_cache()
+    if workers > 1:
+        return fetch_cities_concurrently(cities, workers=workers)
+
+    results: List[Dict[str, Optional[str]]] = []
+    for city, lat, lon in cities:
         res = _fetch_city(city, lat, lon)
         results.append(res)
         time.sleep(SLEEP_BETWEEN_CALLS)
@@ -126,7 +399,9 @@ if __name__ == "__main__":
     out = fetch_all_cities()
     print("Extraction complete. Summary:")
     for r in out:
-        if r.get("success") == "true":
+        if r.get("success") == "true" and not r.get("raw_path"):
+            print(f" - {r['city']}: no new data")
+        elif r.get("success") == "true":
             print(f" - {r['city']}: saved -> {r['raw_path']}")
         else:
             print(f" - {r['city']}: ERROR -> {r.get('error')}")
@@ -6,7 +6,7 @@ import pandas as pd
 import numpy as np
 import math
 
-from supabase import create_client, Client
+from common.supabase_factory import lazy_client
 
 # Load env
 load_dotenv()
@@ -22,7 +22,7 @@ RETRY_DELAY = float(os.getenv("LOAD_RETRY_DELAY", 2.0))  # seconds
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Missing SUPABASE_URL or SUPABASE_KEY in .env")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client(SUPABASE_URL, SUPABASE_KEY)
 
 
 def _normalize_df(df: pd.DataFrame) -> pd.DataFrame:
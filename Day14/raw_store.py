@@ -0,0 +1,172 @@
+# raw_store.py
+
+"""
+Raw payload storage for the AtmosTrack ETL.
+
+extract.py writes every API response through write_raw() and transform.py
+reads them back with read_hourly(). Formats (RAW_FORMAT):
+
+- ndjson.gz  (default) gzip-compressed NDJSON: a "_meta" line with the
+             response metadata, then one line per column
+             ({"column": "pm10", "values": [...]}), so similar values sit
+             together and compress well, and each line parses in one call.
+- ndjson.zst same layout, zstd-compressed (needs `zstandard`).
+- parquet    one column per pollutant plus time; metadata in the schema
+             (needs `pyarrow`).
+- arrow      Arrow IPC file, same columns; read back memory-mapped
+             (needs `pyarrow`).
+- json       the original pretty-printed response.
+
+Files are named <city>_raw_<timestamp>.<ext>, written to a temp file and
+renamed into place, so readers never see a partial file.
+"""
+
+from __future__ import annotations
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+
+EXTENSIONS = {
+    "json": ".json",
+    "ndjson.gz": ".ndjson.gz",
+    "ndjson.zst": ".ndjson.zst",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+RAW_GLOBS = [f"*_raw_*{ext}" for ext in EXTENSIONS.values()]
+
+# --- Helpers ---
+def _split(payload: Dict) -> Tuple[Dict, Dict[str, List]]:
+    """Separate the hourly columns from the rest of the response."""
+    meta = {k: v for k, v in payload.items() if k != "hourly"}
+    return meta, payload.get("hourly") or {}
+
+def _unique_path(raw_dir: Path, stem: str, ext: str) -> Path:
+    path = raw_dir / f"{stem}{ext}"
+    n = 0
+    while path.exists():
+        # two saves for one city within a second must not overwrite each other
+        n += 1
+        path = raw_dir / f"{stem}_{n}{ext}"
+    return path
+
+def _ndjson_lines(meta: Dict, hourly: Dict[str, List]) -> Iterator[bytes]:
+    yield json.dumps({"_meta": meta}, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+    for column, values in hourly.items():
+        line = json.dumps({"column": column, "values": values}, ensure_ascii=False, separators=(",", ":"), default=str)
+        yield line.encode("utf-8") + b"\n"
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("RAW_FORMAT=ndjson.zst needs the zstandard package") from e
+    return zstandard
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("RAW_FORMAT parquet/arrow needs the pyarrow package") from e
+    return pyarrow
+
+def _arrow_table(meta: Dict, hourly: Dict[str, List]):
+    pa = _arrow()
+    table = pa.table({k: v for k, v in hourly.items()})
+    return table.replace_schema_metadata({"meta": json.dumps(meta, default=str)})
+
+# --- Writing ---
+def _write(tmp: Path, payload: object, fmt: str) -> None:
+    if fmt == "json":
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+        return
+    meta, hourly = _split(payload)
+    if fmt == "ndjson.gz":
+        with gzip.open(tmp, "wb", compresslevel=9) as f:
+            for line in _ndjson_lines(meta, hourly):
+                f.write(line)
+    elif fmt == "ndjson.zst":
+        with open(tmp, "wb") as raw, _zstd().ZstdCompressor(level=19).stream_writer(raw) as f:
+            for line in _ndjson_lines(meta, hourly):
+                f.write(line)
+    elif fmt == "parquet":
+        _arrow().parquet.write_table(_arrow_table(meta, hourly), tmp, compression="zstd")
+    elif fmt == "arrow":
+        pa = _arrow()
+        table = _arrow_table(meta, hourly)
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown RAW_FORMAT: {fmt} (expected one of {', '.join(EXTENSIONS)})")
+
+def write_raw(payload: object, city: str, raw_dir: Path, ts: str, fmt: str = "ndjson.gz") -> str:
+    """
+    Atomically write one API response for city and return its absolute path.
+    Payloads without an hourly series (e.g. a non-JSON error body) are kept
+    as JSON whatever the format, since there are no columns to store.
+    """
+    if not (isinstance(payload, dict) and isinstance(payload.get("hourly"), dict)):
+        fmt = "json"
+    stem = f"{city.replace(' ', '_').lower()}_raw_{ts}"
+    path = _unique_path(raw_dir, stem, EXTENSIONS.get(fmt, ""))
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        _write(tmp, payload, fmt)
+    except (TypeError, ValueError):
+        tmp.unlink(missing_ok=True)
+        if fmt not in EXTENSIONS:
+            raise
+        # the original text fallback for anything JSON cannot hold
+        path = _unique_path(raw_dir, stem, ".txt")
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(repr(payload))
+    os.replace(tmp, path)
+    return str(path.resolve())
+
+# --- Reading ---
+def list_raw_files(raw_dir: Path) -> List[Path]:
+    return sorted({p for pattern in RAW_GLOBS for p in raw_dir.glob(pattern)})
+
+def city_of(path: Path) -> str:
+    return path.name.split("_raw_")[0].replace("_", " ").title()
+
+def _read_ndjson(f: io.BufferedIOBase) -> pd.DataFrame:
+    # streamed one column line at a time; the _meta line is skipped
+    columns: Dict[str, List] = {}
+    for line in f:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "column" in record:
+            columns[record["column"]] = record["values"]
+    return pd.DataFrame(columns)
+
+def read_hourly(path: Path) -> pd.DataFrame:
+    """
+    The hourly series of one raw file as a DataFrame (time plus one column
+    per pollutant), whatever format it was written in.
+    """
+    name = path.name
+    if name.endswith(".ndjson.gz"):
+        with gzip.open(path, "rb") as f:
+            return _read_ndjson(f)
+    if name.endswith(".ndjson.zst"):
+        with open(path, "rb") as raw, _zstd().ZstdDecompressor().stream_reader(raw) as f:
+            return _read_ndjson(io.BufferedReader(f))
+    if name.endswith(".parquet"):
+        return _arrow().parquet.read_table(path, memory_map=True).to_pandas()
+    if name.endswith(".arrow"):
+        pa = _arrow()
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return pd.DataFrame(data.get("hourly") or {})
@@ -1,13 +1,23 @@
+import argparse
+import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from raw_store import city_of, list_raw_files, read_hourly
 from datetime import datetime
 # --- Configuration ---
 RAW_DIR = Path("data/raw")
 STAGED_DIR = Path("data/staged")
 STAGED_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_FILE = STAGED_DIR / "air_quality_transformed.csv"
+# incremental mode: one partition per city and day, plus a manifest of processed raw files
+DATASET_DIR = Path(os.getenv("STAGED_DATASET_DIR", STAGED_DIR / "air_quality"))
+MANIFEST_FILE = DATASET_DIR / "_manifest.json"
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", str(os.cpu_count() or 1)))
 
 POLLUTANTS = [
     "pm10", "pm2_5", "carbon_monoxide", "nitrogen_dioxide", "sulphur_dioxide", "ozone", "uv_index"
@@ -40,47 +50,208 @@ def classify_risk(severity: float) -> str:
         return "Moderate Risk"
     else:
         return "Low Risk"
+# --- Vectorized feature engine ---
+# same weights, and the same order of additions, as compute_severity
+SEVERITY_WEIGHTS = {
+    "pm2_5": 5, "pm10": 3, "nitrogen_dioxide": 4, "sulphur_dioxide": 4, "carbon_monoxide": 2, "ozone": 3,
+}
+AQI_LABELS = ["Good", "Moderate", "Unhealthy", "Very Unhealthy", "Hazardous"]
+RISK_LABELS = ["Low Risk", "Moderate Risk", "High Risk"]
+def severity_scores(df: pd.DataFrame) -> np.ndarray:
+    """
+    Weighted sum over the pollutant matrix. Columns are accumulated in
+    compute_severity's order so every float matches the row-wise result.
+    """
+    matrix = df.reindex(columns=list(SEVERITY_WEIGHTS)).to_numpy(dtype=float)
+    weights = np.array(list(SEVERITY_WEIGHTS.values()), dtype=float)
+    scores = matrix[:, 0] * weights[0]
+    for j in range(1, len(weights)):
+        scores = scores + matrix[:, j] * weights[j]
+    return scores
+def aqi_categories(pm2_5: pd.Series) -> pd.Categorical:
+    # NaN fails every bound and lands in the default, as in categorize_aqi
+    v = pm2_5.to_numpy(dtype=float)
+    codes = np.select([v <= 50, v <= 100, v <= 200, v <= 300], [0, 1, 2, 3], default=4)
+    return pd.Categorical.from_codes(codes, categories=AQI_LABELS, ordered=True)
+def risk_levels(severity: np.ndarray) -> pd.Categorical:
+    codes = np.select([severity > 400, severity > 200], [2, 1], default=0)
+    return pd.Categorical.from_codes(codes, categories=RISK_LABELS, ordered=True)
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    """hour, AQI_Category, Severity_Score and Risk_Level for a whole frame at once."""
+    df["hour"] = df["time"].dt.hour
+    df["AQI_Category"] = aqi_categories(df["pm2_5"])
+    severity = severity_scores(df)
+    df["Severity_Score"] = severity
+    df["Risk_Level"] = risk_levels(severity)
+    return df
 # --- Main transformation function ---
+def _city_frame(file: Path) -> Optional[pd.DataFrame]:
+    """Read one raw file into time, city and pollutant columns; None if unusable."""
+    city_name = city_of(file)
+    try:
+        hourly = read_hourly(file)
+    except Exception as e:
+        print(f"❌ Failed to read {file}: {e}")
+        return None
+    if "time" not in hourly.columns:
+        print(f"⚠️ No hourly time data found in {file}")
+        return None
+    df_city = pd.DataFrame({"time": hourly["time"]})
+    df_city["city"] = city_name
+    for pollutant in POLLUTANTS:
+        if pollutant in hourly.columns:
+            df_city[pollutant] = pd.to_numeric(hourly[pollutant], errors="coerce")
+        else:
+            df_city[pollutant] = float("nan")
+    df_city.dropna(subset=POLLUTANTS, how="all", inplace=True)
+    df_city["time"] = pd.to_datetime(df_city["time"])
+    return df_city
 def transform_air_quality(raw_dir: Path = RAW_DIR) -> pd.DataFrame:
     all_records: List[pd.DataFrame] = []
-    raw_files = sorted(raw_dir.glob("*_raw_*.json"))
+    raw_files = list_raw_files(raw_dir)
     for file in raw_files:
-        city_name = file.stem.split("_raw_")[0].replace("_", " ").title()
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"❌ Failed to read {file}: {e}")
-            continue
-        hourly_data = data.get("hourly", {})
-        if not hourly_data:
-            hourly_data = data.get("hourly", {})
-        if "time" not in hourly_data:
-            print(f"⚠️ No hourly time data found in {file}")
-            continue
-        n_records = len(hourly_data["time"])
-        df_city = pd.DataFrame({"time": hourly_data["time"]})
-        df_city["city"] = city_name
-        for pollutant in POLLUTANTS:
-            df_city[pollutant] = pd.to_numeric(hourly_data.get(pollutant, [None]*n_records), errors="coerce")
-        df_city.dropna(subset=POLLUTANTS, how="all", inplace=True)
-        df_city["time"] = pd.to_datetime(df_city["time"])
-        # Derived features
-        df_city["hour"] = df_city["time"].dt.hour
-        df_city["AQI_Category"] = df_city["pm2_5"].apply(categorize_aqi)
-        df_city["Severity_Score"] = df_city.apply(compute_severity, axis=1)
-        df_city["Risk_Level"] = df_city["Severity_Score"].apply(classify_risk)
-        all_records.append(df_city)
+        df_city = _city_frame(file)
+        if df_city is not None:
+            all_records.append(df_city)
     if all_records:
-        df_all = pd.concat(all_records, ignore_index=True)
+        # derived features in one vectorized pass over all cities
+        df_all = add_features(pd.concat(all_records, ignore_index=True))
         df_all.to_csv(OUTPUT_FILE, index=False)
         print(f"✅ Transformed data saved to {OUTPUT_FILE}")
         return df_all
     else:
         print("❌ No data transformed. Check raw files.")
         return pd.DataFrame()
+# --- Incremental, partitioned transformation ---
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+def _load_manifest(path: Path) -> Dict[str, Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+def _save_manifest(path: Path, manifest: Dict[str, Dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+def _partition_slug(city: str) -> str:
+    return city.replace(" ", "_").lower()
+def transform_file(file: Path, dataset_dir: Path = DATASET_DIR) -> Tuple[List[str], int]:
+    """
+    Transform one raw file and write its rows to
+    <dataset_dir>/city=<city>/date=<YYYY-MM-DD>/<raw file stem>.csv.
+    Returns the written paths (relative to dataset_dir) and the row count.
+    Runs in a worker process.
+    """
+    df = _city_frame(file)
+    if df is None or df.empty:
+        return [], 0
+    df = add_features(df)
+    stem = file.name.split(".")[0]
+    outputs = []
+    for (city, day), part in df.groupby([df["city"], df["time"].dt.strftime("%Y-%m-%d")], sort=True):
+        rel = Path(f"city={_partition_slug(city)}") / f"date={day}" / f"{stem}.csv"
+        out = dataset_dir / rel
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(out.name + ".tmp")
+        part.to_csv(tmp, index=False)
+        os.replace(tmp, out)
+        outputs.append(rel.as_posix())
+    return outputs, len(df)
+def transform_incremental(raw_dir: Path = RAW_DIR, dataset_dir: Path = DATASET_DIR,
+                          workers: int = TRANSFORM_WORKERS) -> Dict[str, int]:
+    """
+    Transform only raw files that are new or changed since the last run.
+    The manifest records each processed file's size, mtime and sha256 plus
+    the partitions it produced; files whose size and mtime match are skipped
+    without being read, so a re-run on an unchanged directory only stats.
+    A changed file's old partitions are replaced, and a deleted file's
+    partitions and manifest entry are removed. Files are transformed in a
+    process pool.
+    """
+    manifest_path = dataset_dir / MANIFEST_FILE.name
+    manifest = _load_manifest(manifest_path)
+    summary = {"files": 0, "skipped": 0, "transformed": 0, "failed": 0, "removed": 0, "rows": 0}
+    pending: List[Tuple[Path, Dict]] = []
+    seen = set()
+    for file in list_raw_files(raw_dir):
+        summary["files"] += 1
+        key = file.resolve().as_posix()
+        seen.add(key)
+        st = file.stat()
+        entry = manifest.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            summary["skipped"] += 1
+            continue
+        digest = _file_hash(file)
+        if entry and entry["sha256"] == digest:
+            # touched but identical content: refresh the stat only
+            entry.update(size=st.st_size, mtime=st.st_mtime)
+            summary["skipped"] += 1
+            continue
+        pending.append((file, {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest}))
+    for key in set(manifest) - seen:
+        # raw file deleted since the last run: its rows must not stay staged
+        for old in manifest.pop(key).get("outputs", []):
+            (dataset_dir / old).unlink(missing_ok=True)
+        summary["removed"] += 1
+
+    def finish(file: Path, info: Dict, outputs: List[str], rows: int) -> None:
+        key = file.resolve().as_posix()
+        for old in set(manifest.get(key, {}).get("outputs", [])) - set(outputs):
+            (dataset_dir / old).unlink(missing_ok=True)
+        manifest[key] = {**info, "outputs": outputs, "rows": rows}
+        summary["transformed"] += 1
+        summary["rows"] += rows
+
+    def failed(file: Path, e: Exception) -> None:
+        summary["failed"] += 1
+        print(f"❌ Failed to transform {file}: {e}")
+
+    try:
+        if len(pending) <= 1 or workers <= 1:
+            for file, info in pending:
+                try:
+                    finish(file, info, *transform_file(file, dataset_dir))
+                except Exception as e:
+                    failed(file, e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(transform_file, file, dataset_dir): (file, info) for file, info in pending}
+                for fut, (file, info) in futures.items():
+                    try:
+                        finish(file, info, *fut.result())
+                    except Exception as e:
+                        failed(file, e)
+    finally:
+        # whatever finished is recorded, so an interrupted run resumes where it stopped
+        _save_manifest(manifest_path, manifest)
+    print(f"✅ {summary['transformed']} new/changed raw files -> {summary['rows']} rows in {dataset_dir} "
+          f"({summary['skipped']} unchanged skipped, {summary['removed']} deleted removed)")
+    return summary
+def read_staged(dataset_dir: Path = DATASET_DIR, city: Optional[str] = None) -> pd.DataFrame:
+    """Read the partitioned dataset back (optionally one city) as one DataFrame."""
+    pattern = f"city={_partition_slug(city)}/date=*/*.csv" if city else "city=*/date=*/*.csv"
+    parts = [pd.read_csv(p, parse_dates=["time"]) for p in sorted(dataset_dir.glob(pattern))]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
 # --- CLI Execution ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AtmosTrack transform step")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"transform only new raw files into the partitioned dataset at {DATASET_DIR}")
+    parser.add_argument("--workers", type=int, default=TRANSFORM_WORKERS)
+    args = parser.parse_args()
     print("Starting transformation step...")
-    df = transform_air_quality()
-    print(f"Transformation complete. Rows: {len(df)}")
+    if args.incremental:
+        summary = transform_incremental(workers=args.workers)
+        print(f"Transformation complete. Rows: {summary['rows']}")
+    else:
+        df = transform_air_quality()
+        print(f"Transformation complete. Rows: {len(df)}")
\ No newline at end of file
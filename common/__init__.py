@@ -0,0 +1,6 @@
+"""
+Code shared by the projects in this repo (Day-5, Day-6, Day-13, Day14).
+
+Install it once with `pip install -e .` from the repo root, or put the repo
+root on PYTHONPATH; scripts then just `from common... import ...`.
+"""
@@ -0,0 +1,70 @@
+# common/batching.py
+"""
+Batch runner shared by the bulk imports (retail product/customer import,
+library_cli import).
+
+    def done(batch_no, batch, result, error):
+        ...                                   # runs on the calling thread
+    run_batches(chunked(rows, 500), write, workers=4, on_done=done)
+
+`rows` is consumed lazily and at most 2 * workers batches are in flight, so
+memory stays flat on files of any size. Wrap the write in with_retries() to
+retry transient failures with exponential backoff.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+def chunked(rows, size):
+    """Yield lists of up to size items from rows without reading ahead."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def with_retries(fn, *args, retries=3, retry_delay=1.0, retryable=None):
+    """
+    Call fn(*args), making up to `retries` attempts (always at least one) and
+    sleeping retry_delay, 2 * retry_delay, ... in between. An error for which
+    retryable(error) is false is raised at once.
+    """
+    attempts = max(1, retries)
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if attempt == attempts or (retryable is not None and not retryable(e)):
+                raise
+            time.sleep(retry_delay * 2 ** (attempt - 1))
+
+def run_batches(batches, work, workers=4, on_done=None):
+    """
+    Run work(batch) for every batch on a pool of threads and return the
+    number of batches. on_done(batch_no, batch, result, error) is called on
+    the calling thread as each batch finishes, with error None on success;
+    a failed batch never stops the run.
+    """
+    in_flight = {}
+    count = 0
+
+    def collect(done):
+        for fut in done:
+            batch_no, batch = in_flight.pop(fut)
+            try:
+                result, error = fut.result(), None
+            except Exception as e:
+                result, error = None, e
+            if on_done:
+                on_done(batch_no, batch, result, error)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in batches:
+            count += 1
+            in_flight[pool.submit(work, batch)] = (count, batch)
+            if len(in_flight) >= 2 * workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(in_flight))
+    return count
@@ -0,0 +1,144 @@
+# common/supabase_factory.py
+"""
+Shared, lazily created Supabase client for every script in this repo.
+
+    sb = lazy_client(url, key)                 # nothing is imported or connected yet
+    sb.table("books").select("*").execute()    # client is built here, then reused
+
+Clients are cached per (url, key), so scripts and modules that ask for the same
+project share one client and one tuned keep-alive connection pool. Tuning comes
+from the environment:
+
+    SUPABASE_TIMEOUT          request timeout in seconds (default 10)
+    SUPABASE_MAX_RETRIES      retries on connection errors (default 2)
+    SUPABASE_POOL_SIZE        max pooled connections (default 20)
+    SUPABASE_KEEPALIVE_EXPIRY seconds an idle connection is kept (default 30)
+
+Every request is counted per table (or rpc/<name>) with a latency histogram;
+see get_stats() and format_stats().
+"""
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "2"))
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+
+# upper bounds (ms) of the latency histogram buckets; the last one catches the rest
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+_clients = {}
+_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _table_of(url) -> str:
+    # /rest/v1/products -> products, /rest/v1/rpc/reserve_stock -> rpc/reserve_stock
+    path = urlparse(str(url)).path
+    if "/rest/v1/" in path:
+        return path.split("/rest/v1/", 1)[1].strip("/") or "(root)"
+    return path.strip("/") or "(root)"
+
+def _record(table, elapsed_ms, failed):
+    with _stats_lock:
+        s = _stats.get(table)
+        if s is None:
+            s = _stats[table] = {
+                "requests": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * len(LATENCY_BUCKETS_MS),
+            }
+        s["requests"] += 1
+        s["errors"] += int(failed)
+        s["total_ms"] += elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                s["buckets"][i] += 1
+                break
+
+def _on_request(request):
+    request.extensions["started_at"] = time.perf_counter()
+
+def _on_response(response):
+    started = response.request.extensions.get("started_at")
+    if started is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _record(_table_of(response.request.url), elapsed_ms, response.status_code >= 400)
+
+def _build_http_client():
+    import httpx
+    return httpx.Client(
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=SUPABASE_POOL_SIZE,
+            max_keepalive_connections=SUPABASE_POOL_SIZE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        transport=httpx.HTTPTransport(retries=SUPABASE_MAX_RETRIES),
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+def _create(url, key):
+    from supabase import create_client
+    from supabase import ClientOptions
+    try:
+        options = ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT, httpx_client=_build_http_client())
+    except TypeError:
+        # older supabase releases build their own httpx session (no pool tuning or metrics)
+        options = ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+    return create_client(url, key, options=options)
+
+def get_client(url=None, key=None):
+    """
+    Return the shared client for (url, key), creating it on first use.
+    url/key default to SUPABASE_URL / SUPABASE_KEY from the environment.
+    """
+    url = url or os.getenv("SUPABASE_URL")
+    key = key or os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
+    client = _clients.get((url, key))
+    if client is None:
+        with _lock:
+            client = _clients.get((url, key))
+            if client is None:
+                client = _clients[(url, key)] = _create(url, key)
+    return client
+
+class LazyClient:
+    """
+    Stand-in for a supabase Client that builds the shared client on first attribute access.
+    """
+    def __init__(self, url=None, key=None):
+        self._url = url
+        self._key = key
+
+    def __getattr__(self, name):
+        return getattr(get_client(self._url, self._key), name)
+
+def lazy_client(url=None, key=None) -> LazyClient:
+    return LazyClient(url, key)
+
+def get_stats():
+    """Per-table request/error counts, latency totals and histogram buckets."""
+    with _stats_lock:
+        return {t: {**s, "buckets": list(s["buckets"])} for t, s in _stats.items()}
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+def format_stats() -> str:
+    """Render get_stats() as a small table, busiest table first."""
+    rows = sorted(get_stats().items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    lines = [f"{'table':<30} {'requests':>8} {'errors':>6} {'avg ms':>8} {'max ms':>8}"]
+    for table, s in rows:
+        avg = s["total_ms"] / s["requests"] if s["requests"] else 0.0
+        lines.append(f"{table:<30} {s['requests']:>8} {s['errors']:>6} {avg:>8.1f} {s['max_ms']:>8.1f}")
+    return "\n".join(lines)